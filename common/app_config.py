@@ -1,9 +1,9 @@
 import os
-from typing import Type
+from functools import lru_cache
+from typing import Optional, Type
 
 from pydantic import Field
-from pydantic_settings import BaseSettings
-from werkzeug.utils import import_string
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class BaseConfig(BaseSettings):
@@ -16,14 +16,81 @@ class BaseConfig(BaseSettings):
 
 
 class Config(BaseConfig):
+    # Built once per process and shared; settings are read-only after startup.
+    model_config = SettingsConfigDict(frozen=True)
+
     DEBUG: bool = Field(env='DEBUG', default=False)
     TESTING: bool = Field(env='TESTING', default=False)
     LOGLEVEL: str = Field(env='LOGLEVEL', default='INFO')
 
+    # More than one worker serves with preforked gunicorn processes instead of a single waitress process.
+    SERVER_WORKERS: int = Field(env='SERVER_WORKERS', default=1)
+    SERVER_THREADS: int = Field(env='SERVER_THREADS', default=4)  # per worker
+    SERVER_TIMEOUT: int = Field(env='SERVER_TIMEOUT', default=30)  # seconds
+
     ACCESS_TOKEN_EXPIRE: int = Field(env='ACCESS_TOKEN_EXPIRE', default=3600)
     RESET_TOKEN_EXPIRE: int = Field(env='ACCESS_TOKEN_EXPIRE', default=60*60*24*3)  # 3 days
+    REFRESH_TOKEN_EXPIRE: int = Field(env='REFRESH_TOKEN_EXPIRE', default=60*60*24*30)  # 30 days
+    AUTH_REVOCATION_REFRESH_INTERVAL: float = Field(env='AUTH_REVOCATION_REFRESH_INTERVAL', default=30.0)  # seconds
+
+    # Time budget for a request, in seconds (0 disables); REQUEST_DEADLINES overrides it per endpoint,
+    # e.g. '{"todo_todos": 60}'. It also bounds Postgres statements through statement_timeout.
+    REQUEST_DEADLINE: float = Field(env='REQUEST_DEADLINE', default=10.0)
+    REQUEST_DEADLINES: dict[str, float] = Field(env='REQUEST_DEADLINES', default={})
+    REQUEST_DEADLINE_RETRY_AFTER: int = Field(env='REQUEST_DEADLINE_RETRY_AFTER', default=1)  # seconds
+
+    # Time auth, database, serialization and publishing per request and report it in a Server-Timing header.
+    SERVER_TIMING_ENABLED: bool = Field(env='SERVER_TIMING_ENABLED', default=False)
+
+    # Fail requests that run more SQL statements than their view's query_budget; for tests and local runs.
+    QUERY_BUDGETS_ENFORCED: bool = Field(env='QUERY_BUDGETS_ENFORCED', default=False)
+
+    # Log statements slower than this many seconds (0 disables). Outside production the plans of the
+    # first SLOW_QUERY_EXPLAIN_LIMIT slow runs of each statement are appended to SLOW_QUERY_EXPLAIN_FILE.
+    SLOW_QUERY_THRESHOLD: float = Field(env='SLOW_QUERY_THRESHOLD', default=0.5)
+    SLOW_QUERY_EXPLAIN_LIMIT: int = Field(env='SLOW_QUERY_EXPLAIN_LIMIT', default=3)
+    SLOW_QUERY_EXPLAIN_FILE: str = Field(env='SLOW_QUERY_EXPLAIN_FILE', default='slow_query_plans.log')
+
+    # Admin endpoints (/admin/...) are disabled unless a token is set; callers send it in X-Admin-Token.
+    ADMIN_API_TOKEN: Optional[str] = Field(env='ADMIN_API_TOKEN', default=None)
+    # Limits of the /admin/profile sampling profiler; it keeps its own CPU use under PROFILER_MAX_OVERHEAD of a core.
+    PROFILER_MAX_SECONDS: float = Field(env='PROFILER_MAX_SECONDS', default=60.0)
+    PROFILER_MAX_SAMPLE_RATE: int = Field(env='PROFILER_MAX_SAMPLE_RATE', default=200)  # samples per second
+    PROFILER_MAX_OVERHEAD: float = Field(env='PROFILER_MAX_OVERHEAD', default=0.05)
+
+    # Collect Prometheus metrics; PROMETHEUS_MULTIPROC_DIR aggregates them across gunicorn workers.
+    METRICS_ENABLED: bool = Field(env='METRICS_ENABLED', default=True)
+    # They are served only on this port, kept off the public API port like OUTBOX_RELAY_METRICS_PORT.
+    METRICS_PORT: Optional[int] = Field(env='METRICS_PORT', default=None)
 
     MIME_TYPE: str = 'application/json'
+    NDJSON_MIME_TYPE: str = 'application/x-ndjson'
+    MSGPACK_MIME_TYPE: str = 'application/msgpack'
+    JSON_PROVIDER: str = Field(env='JSON_PROVIDER', default='orjson')  # orjson | default
+    JSON_DATETIME_FORMAT: str = Field(env='JSON_DATETIME_FORMAT', default='http')  # http | iso
+    TODO_STREAM_BATCH_SIZE: int = Field(env='TODO_STREAM_BATCH_SIZE', default=500)
+    TODO_BATCH_MAX_OPERATIONS: int = Field(env='TODO_BATCH_MAX_OPERATIONS', default=100)
+    TODO_CHANGES_PAGE_SIZE: int = Field(env='TODO_CHANGES_PAGE_SIZE', default=500)
+    TODO_CHANGE_STREAM_KEEPALIVE: float = Field(env='TODO_CHANGE_STREAM_KEEPALIVE', default=15.0)  # seconds
+    TODO_CHANGE_STREAM_QUEUE_SIZE: int = Field(env='TODO_CHANGE_STREAM_QUEUE_SIZE', default=100)
+    # Open streams per process; each holds a server thread, so by default one thread is always left for requests.
+    TODO_CHANGE_STREAM_MAX_STREAMS: Optional[int] = Field(env='TODO_CHANGE_STREAM_MAX_STREAMS', default=None)
+    TODO_CHANGE_STREAM_RETRY_AFTER: int = Field(env='TODO_CHANGE_STREAM_RETRY_AFTER', default=10)  # seconds
+    TODO_CHANGE_LISTENER_RECONNECT_DELAY: float = Field(env='TODO_CHANGE_LISTENER_RECONNECT_DELAY', default=5.0)  # seconds
+
+    COMPRESSION_ENABLED: bool = Field(env='COMPRESSION_ENABLED', default=True)
+    COMPRESSION_MIN_SIZE: int = Field(env='COMPRESSION_MIN_SIZE', default=1024)  # bytes
+    COMPRESSION_GZIP_LEVEL: int = Field(env='COMPRESSION_GZIP_LEVEL', default=6)
+    COMPRESSION_BROTLI_QUALITY: int = Field(env='COMPRESSION_BROTLI_QUALITY', default=4)
+    COMPRESSION_ZSTD_LEVEL: int = Field(env='COMPRESSION_ZSTD_LEVEL', default=3)
+
+    # scrypt cost parameters; stored hashes made with other parameters are rehashed on login.
+    PASSWORD_HASH_SCRYPT_N: int = Field(env='PASSWORD_HASH_SCRYPT_N', default=32768)
+    PASSWORD_HASH_SCRYPT_R: int = Field(env='PASSWORD_HASH_SCRYPT_R', default=8)
+    PASSWORD_HASH_SCRYPT_P: int = Field(env='PASSWORD_HASH_SCRYPT_P', default=1)
+    PASSWORD_HASH_WORKERS: int = Field(env='PASSWORD_HASH_WORKERS', default=2)  # 0 hashes on the calling thread
+    PASSWORD_HASH_MAX_PENDING: int = Field(env='PASSWORD_HASH_MAX_PENDING', default=32)
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = Field(env='PASSWORD_HASH_QUEUE_TIMEOUT', default=5.0)  # seconds
 
     SECRET_KEY: str = Field(env='SECRET_KEY', default=None)
     SECURITY_PASSWORD_SALT: str = Field(env='SECURITY_PASSWORD_SALT', default=None)
@@ -48,10 +115,30 @@ class Config(BaseConfig):
 
     QUEUE_NAME_PREFIX: str = Field(env='QUEUE_NAME_PREFIX', default='')
     EMAIL_SERVICE_PROCESSOR_QUEUE_NAME: str = Field(env='EmailServiceProcessor_QUEUE_NAME', default='email-transmitter')
-
+    EMAIL_SERVICE_PROCESSOR_PRIORITY_QUEUE_NAME: str = Field(
+        env='EmailServiceProcessor_PRIORITY_QUEUE_NAME', default='email-transmitter-priority'
+    )
+    EMAIL_SERVICE_PROCESSOR_DEAD_LETTER_QUEUE_NAME: str = Field(
+        env='EmailServiceProcessor_DEAD_LETTER_QUEUE_NAME', default='email-transmitter-dead-letter'
+    )
+
+    BROKER_CONNECT_MAX_RETRIES: int = Field(env='BROKER_CONNECT_MAX_RETRIES', default=3)
+    BROKER_CIRCUIT_FAILURE_THRESHOLD: int = Field(env='BROKER_CIRCUIT_FAILURE_THRESHOLD', default=5)
+    BROKER_CIRCUIT_RECOVERY_TIMEOUT: float = Field(env='BROKER_CIRCUIT_RECOVERY_TIMEOUT', default=30.0)  # seconds
+    BROKER_CIRCUIT_HALF_OPEN_MAX_CALLS: int = Field(env='BROKER_CIRCUIT_HALF_OPEN_MAX_CALLS', default=1)
+    MESSAGE_SPOOL_DIR: Optional[str] = Field(env='MESSAGE_SPOOL_DIR', default=None)
+    # A spooled message claimed this long ago (seconds) by a drain that never finished is replayed again.
+    MESSAGE_SPOOL_CLAIM_TIMEOUT: float = Field(env='MESSAGE_SPOOL_CLAIM_TIMEOUT', default=300.0)
+
+    OUTBOX_RELAY_BATCH_SIZE: int = Field(env='OUTBOX_RELAY_BATCH_SIZE', default=100)
+    OUTBOX_RELAY_POLL_INTERVAL: float = Field(env='OUTBOX_RELAY_POLL_INTERVAL', default=1.0)  # seconds
+    OUTBOX_RELAY_METRICS_INTERVAL: float = Field(env='OUTBOX_RELAY_METRICS_INTERVAL', default=60.0)  # seconds
+    OUTBOX_RELAY_METRICS_PORT: Optional[int] = Field(env='OUTBOX_RELAY_METRICS_PORT', default=None)
+
+
+@lru_cache(maxsize=None)
 def get_config() -> Config:
-    conf = Config()
-    return conf
+    return Config()
 
 
 config = get_config()
@@ -2,15 +2,15 @@ import logging
 import os
 import sys
 
-import rollbar
-from rollbar.logger import RollbarHandler
-
 from common.app_config import config
 
 ROLLBAR_ACCESS_TOKEN = config.ROLLBAR_ACCESS_TOKEN
 ROLLBAR_ENVIRONMENT = config.APP_ENV
 
+# rollbar is only imported when it is going to be used; it is slow to import.
 if ROLLBAR_ACCESS_TOKEN:
+    import rollbar
+
     rollbar.init(
         access_token=config.ROLLBAR_ACCESS_TOKEN,
         environment=config.APP_ENV,
@@ -30,6 +30,8 @@ def _get_formatter():
 
 
 def rollbar_except_hook(exc_type, exc_value, traceback):
+    import rollbar
+
     # Report the issue to rollbar here.
     rollbar.report_exc_info((exc_type, exc_value, traceback))
     # display the error as normal here
@@ -47,6 +49,8 @@ def get_console_handler():
 
 
 def get_rollbar_handler():
+    from rollbar.logger import RollbarHandler
+
     loglevel = getattr(logging, config.LOGLEVEL, 'WARN')
     rollbar_handler = RollbarHandler(access_token=ROLLBAR_ACCESS_TOKEN, environment=ROLLBAR_ENVIRONMENT)
     rollbar_handler.setLevel(loglevel)
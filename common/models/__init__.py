@@ -3,4 +3,7 @@ from .person_organization_role import PersonOrganizationRole
 from .organization import Organization
 from .login_method import LoginMethod
 from .email import Email
-from .todo import Todo
\ No newline at end of file
+from .todo import Todo, TodoRow
+from .outbox_message import OutboxMessage
+from .refresh_token import RefreshToken
+from .access_token_revocation import AccessTokenRevocation
\ No newline at end of file
@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+from rococo.models.versioned_model import VersionedModel
+
+
+@dataclass
+class AccessTokenRevocation(VersionedModel):
+    """
+    Invalidates every access token issued to a person before `revoked_before` (epoch seconds).
+
+    Written when a person's credentials change, and checked by the stateless
+    authorization path that does not otherwise hit the database.
+    """
+
+    person_id: str = None
+    revoked_before: float = None
@@ -0,0 +1,27 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+
+from rococo.models.versioned_model import VersionedModel, default_datetime
+
+
+class OutboxMessageStatusEnum(Enum):
+    PENDING = "PENDING"
+    SENT = "SENT"
+
+
+@dataclass
+class OutboxMessage(VersionedModel):
+    """
+    A message waiting to be relayed to the message broker.
+
+    Rows are written in the same transaction as the domain changes that produce
+    them and picked up later by `common.tasks.outbox_relay`.
+    """
+
+    queue_name: str = None
+    payload: dict = None
+    priority: int = 0
+    status: str = OutboxMessageStatusEnum.PENDING.value
+    created_on: datetime = field(default_factory=default_datetime)
+    sent_on: datetime = None
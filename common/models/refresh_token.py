@@ -0,0 +1,24 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from rococo.models.versioned_model import VersionedModel, default_datetime
+
+
+@dataclass
+class RefreshToken(VersionedModel):
+    """
+    A long-lived token exchanged at `/auth/refresh` for a new access token.
+
+    Only a SHA-256 hash of the token is stored. Every refresh rotates the token: the
+    presented one is marked as used and a new one is issued in the same `family_id`.
+    Presenting a used token again means it leaked, so its whole family is revoked.
+    """
+
+    person_id: str = None
+    email_id: str = None
+    token_hash: str = None
+    family_id: str = None
+    created_on: datetime = field(default_factory=default_datetime)
+    expires_on: datetime = None
+    used_on: datetime = None
+    revoked_on: datetime = None
@@ -13,3 +13,24 @@ class Todo(VersionedModel):
     title: str = None
     is_completed: bool = False
     created_on: datetime = field(default_factory=default_datetime)
+
+
+@dataclass(frozen=True, slots=True)
+class TodoRow:
+    """
+    A read-only todo row for list responses.
+
+    Built directly from query results, skipping VersionedModel hydration and validation.
+    Use `Todo` for anything that gets modified or saved.
+    """
+
+    entity_id: str
+    version: str
+    previous_version: str
+    active: bool
+    changed_by_id: str
+    changed_on: datetime
+    person_id: str
+    title: str
+    is_completed: bool
+    created_on: datetime
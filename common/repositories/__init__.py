@@ -3,4 +3,7 @@ from .email import EmailRepository
 from .organization import OrganizationRepository
 from .login_method import LoginMethodRepository
 from .person_organization_role import PersonOrganizationRoleRepository
-from .todo import TodoRepository
\ No newline at end of file
+from .todo import TodoRepository
+from .outbox_message import OutboxMessageRepository
+from .refresh_token import RefreshTokenRepository
+from .access_token_revocation import AccessTokenRevocationRepository
\ No newline at end of file
@@ -0,0 +1,22 @@
+from common.repositories.base import BaseRepository
+from common.models.access_token_revocation import AccessTokenRevocation
+
+
+class AccessTokenRevocationRepository(BaseRepository):
+    MODEL = AccessTokenRevocation
+
+    def get_revocations_since(self, since: float) -> dict[str, float]:
+        """
+        Get the latest revocation time of every person revoked after `since` (epoch seconds).
+
+        :return: Mapping of person ID to the time (epoch seconds) before which their access tokens are revoked
+        """
+        query = """
+            SELECT person_id, MAX(revoked_before) AS revoked_before
+            FROM access_token_revocation
+            WHERE revoked_before > %s AND active = true
+            GROUP BY person_id;
+        """
+        with self.adapter:
+            results = self.adapter.execute_query(query, (since,))
+        return {result["person_id"]: result["revoked_before"] for result in results}
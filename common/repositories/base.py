@@ -1,8 +1,62 @@
+import inspect
+from contextvars import ContextVar
+from functools import wraps
+
 from rococo.repositories.postgresql import PostgreSQLRepository
 from rococo.data.postgresql import PostgreSQLAdapter
 from rococo.messaging.base import MessageAdapter
+from rococo.models import VersionedModel
 from typing import Optional
 
+# Inherited methods that run queries; a repository's own public methods are tracked too.
+TRACKED_BASE_METHODS = ('get_one', 'get_many', 'save', 'delete', 'run_transaction')
+
+# (repository, method) of the outermost repository call running on this thread, if any.
+_current_operation = ContextVar('repository_operation', default=None)
+
+
+def get_current_operation() -> Optional[tuple[str, str]]:
+    """The (repository class name, method name) whose queries are running right now, or None."""
+    return _current_operation.get()
+
+
+def _track_operation(func):
+    """Record the repository and method name while `func` runs, so its queries can be attributed to it."""
+    if inspect.isgeneratorfunction(func):
+        @wraps(func)
+        def generator_wrapper(self, *args, **kwargs):
+            # Only while the generator runs; between items the caller may run queries of its own.
+            generator = func(self, *args, **kwargs)
+            try:
+                while True:
+                    token = _current_operation.set(_current_operation.get() or (type(self).__name__, func.__name__))
+                    try:
+                        item = next(generator)
+                    except StopIteration as stop:
+                        return stop.value
+                    finally:
+                        _current_operation.reset(token)
+                    yield item
+            finally:
+                generator.close()
+
+        generator_wrapper.tracks_operation = True
+        return generator_wrapper
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if _current_operation.get() is not None:
+            # Nested calls (save_many -> run_transaction) belong to the outermost one.
+            return func(self, *args, **kwargs)
+        token = _current_operation.set((type(self).__name__, func.__name__))
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            _current_operation.reset(token)
+
+    wrapper.tracks_operation = True
+    return wrapper
+
 
 class BaseRepository(PostgreSQLRepository):
     MODEL = None
@@ -12,9 +66,59 @@ class BaseRepository(PostgreSQLRepository):
         if cls.MODEL is None:
             raise TypeError(f"Subclasses of {cls.__name__} must define the MODEL attribute.")
 
+        for name in set(TRACKED_BASE_METHODS) | {name for name in vars(cls) if not name.startswith('_')}:
+            method = getattr(cls, name, None)
+            if inspect.isfunction(method) and not getattr(method, 'tracks_operation', False):
+                setattr(cls, name, _track_operation(method))
+
     def __init__(
             self, db_adapter: PostgreSQLAdapter, message_adapter: Optional[MessageAdapter], 
             queue_name: str, user_id: str = None
     ):
         # Pass MODEL as the model to the BaseRepository
         super().__init__(db_adapter, self.MODEL, message_adapter, queue_name, user_id=user_id)
+
+    def get_save_queries(self, instance: VersionedModel) -> list:
+        """
+        Build the queries `save` would run for `instance` without executing them,
+        so they can be combined with other queries in a single transaction.
+        """
+        data = self._process_data_before_save(instance)
+        return [
+            self.adapter.get_move_entity_to_audit_table_query(self.table_name, instance.entity_id),
+            self.adapter.get_save_query(self.table_name, data)
+        ]
+
+    def get_bulk_save_queries(self, instances: list[VersionedModel]) -> list:
+        """
+        Build the queries to save many instances with two statements: one copying their
+        current rows to the audit table and one multi-row upsert.
+
+        Instances must have distinct entity IDs.
+        """
+        if not instances:
+            return []
+
+        rows = [self._process_data_before_save(instance) for instance in instances]
+        columns = list(rows[0].keys())
+        entity_ids = [row['entity_id'] for row in rows]
+
+        entity_id_placeholders = ', '.join(['%s'] * len(entity_ids))
+        move_entities_query = (
+            f"INSERT INTO {self.table_name}_audit "
+            f"(SELECT * FROM {self.table_name} WHERE entity_id IN ({entity_id_placeholders}))"
+        )
+
+        row_placeholders = ', '.join(['(' + ', '.join(['%s'] * len(columns)) + ')'] * len(rows))
+        update_columns = ', '.join([f"{column} = EXCLUDED.{column}" for column in columns if column != 'entity_id'])
+        save_entities_query = (
+            f"INSERT INTO {self.table_name} ({', '.join(columns)}) VALUES {row_placeholders} "
+            f"ON CONFLICT (entity_id) DO UPDATE SET {update_columns}"
+        )
+        values = tuple(row[column] for row in rows for column in columns)
+
+        return [(move_entities_query, tuple(entity_ids)), (save_entities_query, values)]
+
+    def run_transaction(self, queries: list) -> None:
+        with self.adapter:
+            self.adapter.run_transaction(queries)
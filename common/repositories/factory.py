@@ -4,6 +4,7 @@ from rococo.data.postgresql import PostgreSQLAdapter
 from rococo.messaging.rabbitmq import RabbitMqConnection
 from typing import Optional
 from common.app_logger import logger
+from common.utils.deadline import apply_statement_timeout, check_deadline
 
 
 def get_flask_pooled_db():
@@ -41,7 +42,14 @@ class MessageAdapterType(str, Enum):
 def get_connection_resolver():
     pooled_db = get_flask_pooled_db()
     if pooled_db:
-        return pooled_db.get_connection
+        def resolve_connection(*args, **kwargs):
+            # Don't wait on the pool, or let Postgres run a statement, past the request's deadline.
+            check_deadline()
+            connection = pooled_db.get_connection(*args, **kwargs)
+            apply_statement_timeout(connection)
+            return connection
+
+        return resolve_connection
 
 
 def get_connection_closer():
@@ -63,6 +71,9 @@ class RepoType(Enum):
     LOGIN_METHOD = auto()
     PERSON_ORGANIZATION_ROLE = auto()
     TODO = auto()
+    OUTBOX_MESSAGE = auto()
+    REFRESH_TOKEN = auto()
+    ACCESS_TOKEN_REVOCATION = auto()
 
 
 class RepositoryFactory:
@@ -76,7 +87,10 @@ class RepositoryFactory:
         RepoType.EMAIL: EmailRepository,
         RepoType.LOGIN_METHOD: LoginMethodRepository,
         RepoType.PERSON_ORGANIZATION_ROLE: PersonOrganizationRoleRepository,
-        RepoType.TODO: TodoRepository
+        RepoType.TODO: TodoRepository,
+        RepoType.OUTBOX_MESSAGE: OutboxMessageRepository,
+        RepoType.REFRESH_TOKEN: RefreshTokenRepository,
+        RepoType.ACCESS_TOKEN_REVOCATION: AccessTokenRevocationRepository
     }
 
     def get_db_connection(self):
@@ -110,3 +124,10 @@ class RepositoryFactory:
             return repo_class(adapter, message_adapter, message_queue_name, person_id)
 
         raise ValueError(f"No repository found with the name '{repo_type}'")
+
+    def get_repository_for_model(self, model, person_id=None):
+        for repo_type, repo_class in self._repositories.items():
+            if repo_class.MODEL is model:
+                return self.get_repository(repo_type, person_id)
+
+        raise ValueError(f"No repository found for the model '{model.__name__}'")
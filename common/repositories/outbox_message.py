@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Callable
+
+from common.repositories.base import BaseRepository
+from common.models.outbox_message import OutboxMessage, OutboxMessageStatusEnum
+
+
+class OutboxMessageRepository(BaseRepository):
+    MODEL = OutboxMessage
+
+    def relay_pending_messages(self, publish: Callable[[list[OutboxMessage]], None], batch_size: int) -> int:
+        """
+        Lock a batch of pending messages, hand them to `publish` and mark them as sent.
+
+        Rows are claimed highest priority first with `FOR UPDATE SKIP LOCKED`, so several
+        relay workers can drain the outbox concurrently without picking up the same message twice.
+        If `publish` raises, the transaction is rolled back and the batch stays pending.
+
+        :param publish: Callable publishing a list of messages to the broker
+        :param batch_size: Maximum number of messages to claim
+        :return: Number of messages relayed
+        """
+        query = """
+            SELECT *
+            FROM outbox_message
+            WHERE status = %s AND active = true
+            ORDER BY priority DESC, created_on
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED;
+        """
+        params = (OutboxMessageStatusEnum.PENDING.value, batch_size)
+
+        with self.adapter:
+            try:
+                results = self.adapter.execute_query(query, params)
+                messages = [self.model.from_dict(result) for result in results]
+                if messages:
+                    publish(messages)
+                    placeholders = ', '.join(['%s'] * len(messages))
+                    self.adapter.execute_query(
+                        f"UPDATE outbox_message SET status = %s, sent_on = %s WHERE entity_id IN ({placeholders});",
+                        (OutboxMessageStatusEnum.SENT.value, datetime.utcnow(), *[message.entity_id for message in messages])
+                    )
+                else:
+                    self.adapter._connection.rollback()
+            except Exception:
+                self.adapter._connection.rollback()
+                raise
+
+        return len(messages)
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from common.repositories.base import BaseRepository
+from common.models.refresh_token import RefreshToken
+
+
+class RefreshTokenRepository(BaseRepository):
+    MODEL = RefreshToken
+
+    def mark_as_used(self, refresh_token: RefreshToken) -> bool:
+        """
+        Atomically mark a token as used, unless it was already used or revoked.
+
+        :return: Whether this call marked the token, i.e. whether the caller may rotate it
+        """
+        query = """
+            UPDATE refresh_token
+            SET used_on = %s
+            WHERE entity_id = %s AND used_on IS NULL AND revoked_on IS NULL;
+        """
+        with self.adapter:
+            self.adapter.execute_query(query, (datetime.utcnow(), refresh_token.entity_id))
+            return self.adapter._cursor.rowcount == 1
+
+    def revoke(self, person_id: str, family_id: str = None) -> None:
+        """Revoke a person's unrevoked tokens, optionally only those of one family."""
+        query = "UPDATE refresh_token SET revoked_on = %s WHERE person_id = %s AND revoked_on IS NULL"
+        params = [datetime.utcnow(), person_id]
+        if family_id is not None:
+            query += " AND family_id = %s"
+            params.append(family_id)
+
+        with self.adapter:
+            self.adapter.execute_query(query, tuple(params))
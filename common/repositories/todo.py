@@ -1,6 +1,131 @@
+import json
+from dataclasses import fields
+from datetime import datetime
+from itertools import starmap
+from typing import Iterator
+from uuid import uuid4
+
 from common.repositories.base import BaseRepository
-from common.models.todo import Todo
+from common.models.todo import Todo, TodoRow
+
+# Selected explicitly so result tuples line up with the TodoRow fields.
+TODO_ROW_COLUMNS = ", ".join(field.name for field in fields(TodoRow))
+
+
+def get_todo_change_channel(person_id: str) -> str:
+    """Name of the Postgres NOTIFY channel carrying a person's todo changes."""
+    return f"todo_changes_{person_id}"
+
+
+def get_todo_change_event(todo: Todo) -> dict:
+    """Compact change event pushed to a person's open streams when one of their todos is saved."""
+    return {
+        "entity_id": todo.entity_id,
+        "version": todo.version,
+        "changed_on": todo.changed_on.isoformat(),
+        "active": todo.active,
+        "title": todo.title,
+        "is_completed": todo.is_completed,
+    }
 
 
 class TodoRepository(BaseRepository):
     MODEL = Todo
+
+    def save(self, instance: Todo) -> Todo:
+        """Save a todo and notify its owner's channel in the same transaction."""
+        queries = self.get_save_queries(instance)
+        self.run_transaction(queries + [self.get_notify_query([instance])])
+        return instance
+
+    def save_many(self, todos: list[Todo]) -> list[Todo]:
+        """Save todos with distinct IDs in one transaction of three statements, notifying their owners."""
+        if todos:
+            self.run_transaction(self.get_bulk_save_queries(todos) + [self.get_notify_query(todos)])
+        return todos
+
+    def get_notify_query(self, todos: list[Todo]) -> tuple:
+        """
+        Build a query sending one change event per todo on its owner's channel.
+
+        Postgres only delivers the notifications once the surrounding transaction commits,
+        so it must run after the save queries it describes.
+        """
+        placeholders = ', '.join(['(%s, %s)'] * len(todos))
+        values = []
+        for todo in todos:
+            values += [get_todo_change_channel(todo.person_id), json.dumps(get_todo_change_event(todo))]
+        return (
+            f"SELECT pg_notify(channel, payload) FROM (VALUES {placeholders}) AS notification (channel, payload)",
+            tuple(values)
+        )
+
+    def get_todo_rows_by_person(self, person_id: str, is_completed: bool = None) -> list[TodoRow]:
+        """
+        Get a person's active todos as read-only rows, oldest first.
+        """
+        query, params = self._get_todos_by_person_query(person_id, is_completed)
+        with self.adapter:
+            cursor = self.adapter._cursor
+            cursor.execute(query, params)
+            return list(starmap(TodoRow, cursor.fetchall()))
+
+    def get_changes_since(
+            self, person_id: str, after: int = None, changed_since: datetime = None, limit: int = 500
+    ) -> list[tuple[int, TodoRow]]:
+        """
+        Get a person's todos changed after the change sequence number `after`, oldest change first,
+        including soft-deleted ones, each with its change sequence number.
+
+        Every save gives a todo the next number of `todo_change_seq`, and one person's numbers
+        commit in order (see migration 0000000013), so paging on them never skips a change.
+        `changed_since` serves watermarks from before the sequence: it matches `changed_on` at
+        or after the timestamp and may repeat changes the client already has. Without either
+        every todo of the person is returned. Served by the `(person_id, change_seq)` index.
+        """
+        query = f"SELECT change_seq, {TODO_ROW_COLUMNS} FROM todo WHERE person_id = %s"
+        params = [person_id]
+        if after is not None:
+            query += " AND change_seq > %s"
+            params.append(after)
+        elif changed_since is not None:
+            query += " AND changed_on >= %s"
+            params.append(changed_since)
+        query += " ORDER BY change_seq ASC LIMIT %s"
+        params.append(limit)
+
+        with self.adapter:
+            cursor = self.adapter._cursor
+            cursor.execute(query, params)
+            return [(row[0], TodoRow(*row[1:])) for row in cursor.fetchall()]
+
+    def iter_todos_by_person(self, person_id: str, is_completed: bool = None, batch_size: int = 500) -> Iterator[list[TodoRow]]:
+        """
+        Yield a person's active todos as read-only rows in batches, oldest first, read through a server-side cursor.
+
+        Only one batch is held in memory at a time regardless of how many todos the person has.
+        The connection stays checked out until the generator is exhausted or closed.
+        """
+        query, params = self._get_todos_by_person_query(person_id, is_completed)
+
+        with self.adapter:
+            connection = self.adapter._connection
+            # A named cursor makes psycopg2 declare a server-side cursor instead of fetching every row.
+            cursor = connection.cursor(name=f"todo_stream_{uuid4().hex}")
+            try:
+                cursor.execute(query, params)
+                while rows := cursor.fetchmany(batch_size):
+                    yield list(starmap(TodoRow, rows))
+            finally:
+                cursor.close()
+                # End the read-only transaction that held the server-side cursor open.
+                connection.rollback()
+
+    def _get_todos_by_person_query(self, person_id: str, is_completed: bool = None) -> tuple[str, list]:
+        query = f"SELECT {TODO_ROW_COLUMNS} FROM todo WHERE person_id = %s AND active = true"
+        params = [person_id]
+        if is_completed is not None:
+            query += " AND is_completed = %s"
+            params.append(is_completed)
+        query += " ORDER BY created_on ASC"
+        return query, params
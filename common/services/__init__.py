@@ -3,5 +3,8 @@ from .email import EmailService
 from .login_method import LoginMethodService
 from .organization import OrganizationService
 from .person_organization_role import PersonOrganizationRoleService
+from .outbox_message import OutboxMessageService
+from .refresh_token import RefreshTokenService
+from .access_token_revocation import AccessTokenRevocationService
 from .auth import AuthService
 from .todo import TodoService
\ No newline at end of file
@@ -0,0 +1,34 @@
+import time
+
+from common.repositories.factory import RepositoryFactory, RepoType
+from common.models.access_token_revocation import AccessTokenRevocation
+
+
+class AccessTokenRevocationService:
+    """Service class for revoking access tokens before they expire."""
+
+    def __init__(self, config):
+        self.config = config
+        self.repository_factory = RepositoryFactory(config)
+        self.access_token_revocation_repo = self.repository_factory.get_repository(RepoType.ACCESS_TOKEN_REVOCATION)
+
+    def revoke_access_tokens(self, person_id: str) -> None:
+        """
+        Revoke every access token issued to a person until now.
+
+        :param person_id: ID of the person
+        """
+        # Full precision, like `iat`: a token issued right after this call, such as the one a
+        # password reset returns, is not revoked.
+        self.access_token_revocation_repo.save(
+            AccessTokenRevocation(person_id=person_id, revoked_before=time.time())
+        )
+
+    def get_active_revocations(self) -> dict[str, float]:
+        """
+        Get the revocations that can still affect an unexpired access token.
+
+        :return: Mapping of person ID to the time (epoch seconds) before which their access tokens are revoked
+        """
+        since = time.time() - int(self.config.ACCESS_TOKEN_EXPIRE)
+        return self.access_token_revocation_repo.get_revocations_since(since)
@@ -1,16 +1,15 @@
 from common.services import (
     PersonService, EmailService, LoginMethodService, OrganizationService,
-    PersonOrganizationRoleService
+    PersonOrganizationRoleService, OutboxMessageService, RefreshTokenService, AccessTokenRevocationService
 )
-from common.models import Person, Email, LoginMethod, Organization, PersonOrganizationRole
+from common.models import Person, Email, LoginMethod, Organization, PersonOrganizationRole, OutboxMessage
 from common.models.login_method import LoginMethodType
-from common.tasks.send_message import MessageSender
+from common.tasks.email_lanes import get_email_lane, get_email_lane_queue_name, EMAIL_LANE_PRIORITIES
 from common.app_logger import logger
+from common.utils.password_hasher import password_hasher
 
-from werkzeug.security import check_password_hash
-
-import jwt
 import time
+from datetime import timezone
 
 from app.helpers.string_utils import urlsafe_base64_encode, force_bytes
 from app.helpers.string_utils import force_str, urlsafe_base64_decode
@@ -21,16 +20,15 @@ class AuthService:
     def __init__(self, config):
         self.config = config
 
-        self.EMAIL_TRANSMITTER_QUEUE_NAME = config.QUEUE_NAME_PREFIX + config.EMAIL_SERVICE_PROCESSOR_QUEUE_NAME
-        
         self.person_service = PersonService(config)
         self.email_service = EmailService(config)
         self.login_method_service = LoginMethodService(config)
         self.organization_service = OrganizationService(config)
         self.person_organization_role_service = PersonOrganizationRoleService(config)
+        self.outbox_message_service = OutboxMessageService(config)
+        self.refresh_token_service = RefreshTokenService(config)
+        self.access_token_revocation_service = AccessTokenRevocationService(config)
 
-        self.message_sender = MessageSender()
-        
 
     def signup(self, email, first_name, last_name, password, confirm_password):
         if password != confirm_password:
@@ -60,13 +58,15 @@ class AuthService:
             role="admin"
         )
 
-        email = self.email_service.save_email(email)
-        person = self.person_service.save_person(person)
-        login_method = self.login_method_service.save_login_method(login_method)
-        organization = self.organization_service.save_organization(organization)
-        person_organization_role = self.person_organization_role_service.save_person_organization_role(person_organization_role)
+        # Save the new account together with its welcome email so neither can exist without the other.
+        messages = []
+        if welcome_email_message := self.get_welcome_email_message(login_method, email.email):
+            messages.append(self.get_email_outbox_message(welcome_email_message))
 
-        self.send_welcome_email(login_method, person, email.email)
+        self.outbox_message_service.save_with_messages(
+            [email, person, login_method, organization, person_organization_role],
+            messages
+        )
 
 
     def prepare_password_reset_url(self, login_method: LoginMethod, email: str):
@@ -79,7 +79,7 @@ class AuthService:
         email_verification_url = self.config.VUE_APP_URI + "/verify-email/" + token + "/" + uid
         return email_verification_url
 
-    def send_welcome_email(self, login_method: LoginMethod, person: Person, email: str):
+    def get_welcome_email_message(self, login_method: LoginMethod, email: str):
         if confirmation_link := self.prepare_email_verification_url(login_method, email):
             message = {
                 "event": "WELCOME_EMAIL",
@@ -90,7 +90,17 @@ class AuthService:
             }
             logger.info("confirmation_link")
             logger.info(confirmation_link)
-            self.message_sender.send_message(self.EMAIL_TRANSMITTER_QUEUE_NAME, message)
+            return message
+
+    @staticmethod
+    def get_email_outbox_message(message: dict) -> OutboxMessage:
+        # Route the email to its lane so that bulk mail never delays transactional mail.
+        lane = get_email_lane(message["event"])
+        return OutboxMessage(
+            queue_name=get_email_lane_queue_name(lane),
+            payload=message,
+            priority=EMAIL_LANE_PRIORITIES[lane]
+        )
 
     def login_user_by_email_password(self, email: str, password: str):
         email_obj = self.email_service.get_email_by_email_address(email)
@@ -101,15 +111,33 @@ class AuthService:
             raise InputValidationError("Email is not verified.")
 
         login_method = self.login_method_service.get_login_method_by_email_id(email_obj.entity_id)
-        if not check_password_hash(login_method.password, password):
+        if not password_hasher.verify_password(login_method.password, password):
             raise InputValidationError('Incorrect email or password.')
 
+        # Upgrade hashes made with outdated cost parameters while the plain password is at hand.
+        if password_hasher.needs_rehash(login_method.password):
+            login_method = self.login_method_service.update_password(
+                login_method, password_hasher.hash_password(password)
+            )
+
         access_token, expiry = self.generate_access_token(login_method)
+        refresh_token, refresh_token_record = self.refresh_token_service.issue_refresh_token(
+            login_method.person_id, login_method.email_id
+        )
+
+        return access_token, expiry, refresh_token, refresh_token_record.expires_on.replace(tzinfo=timezone.utc).timestamp()
+
+    def refresh_access_token(self, refresh_token: str):
+        # Rotating the refresh token only needs a hash lookup, so clients stay logged in without re-verifying the password.
+        new_refresh_token, refresh_token_record = self.refresh_token_service.rotate_refresh_token(refresh_token)
+        access_token, expiry = self.generate_access_token(refresh_token_record)
 
-        return access_token, expiry
+        return access_token, expiry, new_refresh_token, refresh_token_record.expires_on.replace(tzinfo=timezone.utc).timestamp()
 
 
     def generate_email_token(self, login_method: LoginMethod, email: str, context: str):
+        import jwt  # imported on first use to keep it out of app startup
+
         person_id, email_id = login_method.person_id, login_method.email_id
         token = jwt.encode(
             {
@@ -127,11 +155,14 @@ class AuthService:
         return token, uid
 
     def generate_access_token(self, login_method: LoginMethod) -> str:
+        import jwt
+
         expiry = time.time() + int(self.config.ACCESS_TOKEN_EXPIRE)
         token = jwt.encode(
             {
                 'email_id': login_method.email_id,
                 'person_id': login_method.person_id,
+                'iat': time.time(),
                 'exp': expiry,
             },
             self.config.AUTH_JWT_SECRET,
@@ -140,6 +171,8 @@ class AuthService:
         return token, expiry
 
     def parse_access_token(self, access_token: str) -> dict:
+        import jwt
+
         try:
             decoded_token = jwt.decode(
                 access_token,
@@ -154,6 +187,8 @@ class AuthService:
 
     @staticmethod
     def parse_email_token(token, login_method: LoginMethod):
+        import jwt
+
         try:
             decoded = jwt.decode(token, login_method.password, algorithms=['HS256'])
             exp_time = decoded['exp']
@@ -187,7 +222,7 @@ class AuthService:
                 },
                 "to_emails": [email],
             }
-            self.message_sender.send_message(self.EMAIL_TRANSMITTER_QUEUE_NAME, message)
+            self.outbox_message_service.save_with_messages([], [self.get_email_outbox_message(message)])
 
 
     def reset_user_password(self, token: str, uidb64: str, password: str):
@@ -218,6 +253,8 @@ class AuthService:
         
         
         login_method = self.login_method_service.update_password(login_method, new_login_method.password)
+        self.refresh_token_service.revoke_refresh_tokens(login_method.person_id)
+        self.access_token_revocation_service.revoke_access_tokens(login_method.person_id)
         email_obj = self.email_service.verify_email(email_obj)
 
         access_token, expiry = self.generate_access_token(login_method)
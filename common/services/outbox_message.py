@@ -0,0 +1,54 @@
+from typing import Callable
+
+from rococo.models import VersionedModel
+
+from common.repositories.factory import RepositoryFactory, RepoType
+from common.models.outbox_message import OutboxMessage
+
+
+class OutboxMessageService:
+    """Service class for writing to and relaying from the transactional outbox."""
+
+    def __init__(self, config):
+        self.config = config
+        self.repository_factory = RepositoryFactory(config)
+        self.outbox_message_repo = self.repository_factory.get_repository(RepoType.OUTBOX_MESSAGE)
+
+    def save_with_messages(self, instances: list[VersionedModel], messages: list[OutboxMessage]) -> list[VersionedModel]:
+        """
+        Save model instances and enqueue messages in a single database transaction.
+
+        :param instances: Models to save, each through the repository registered for its class
+        :param messages: Outbox messages to enqueue for the outbox relay
+        :return: Saved model instances
+        """
+        queries = []
+        for instance in instances:
+            repo = self.repository_factory.get_repository_for_model(type(instance))
+            queries += repo.get_save_queries(instance)
+
+        for outbox_message in messages:
+            queries += self.outbox_message_repo.get_save_queries(outbox_message)
+
+        self.outbox_message_repo.run_transaction(queries)
+        return instances
+
+    def enqueue_message(self, queue_name: str, data: dict, priority: int = 0) -> None:
+        """
+        Enqueue a single message for the outbox relay.
+
+        :param queue_name: Name of the RabbitMQ queue to deliver the message to
+        :param data: The message payload as a dictionary
+        :param priority: Relay order; higher priorities are published first
+        """
+        self.save_with_messages([], [OutboxMessage(queue_name=queue_name, payload=data, priority=priority)])
+
+    def relay_pending_messages(self, publish: Callable[[list[OutboxMessage]], None], batch_size: int) -> int:
+        """
+        Publish a batch of pending messages and mark them as sent.
+
+        :param publish: Callable publishing a list of messages to the broker
+        :param batch_size: Maximum number of messages to relay
+        :return: Number of messages relayed
+        """
+        return self.outbox_message_repo.relay_pending_messages(publish, batch_size)
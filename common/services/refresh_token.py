@@ -0,0 +1,73 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+
+from common.repositories.factory import RepositoryFactory, RepoType
+from common.models.refresh_token import RefreshToken
+from common.services.access_token_revocation import AccessTokenRevocationService
+from common.app_logger import logger
+from app.helpers.exceptions import APIException
+
+
+class RefreshTokenService:
+    """Service class for issuing and rotating refresh tokens."""
+
+    def __init__(self, config):
+        self.config = config
+        self.repository_factory = RepositoryFactory(config)
+        self.refresh_token_repo = self.repository_factory.get_repository(RepoType.REFRESH_TOKEN)
+        self.access_token_revocation_service = AccessTokenRevocationService(config)
+
+    @staticmethod
+    def hash_token(token: str) -> str:
+        # Tokens are random and high-entropy, so a fast hash is enough to keep them out of the database.
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def issue_refresh_token(self, person_id: str, email_id: str, family_id: str = None) -> tuple[str, RefreshToken]:
+        """
+        Issue a new refresh token.
+
+        :param person_id: ID of the person the token authenticates
+        :param email_id: ID of the email the person logged in with
+        :param family_id: Family of the token being rotated, or None to start a new family at login
+        :return: The token to hand to the client and its stored record
+        """
+        token = secrets.token_urlsafe(32)
+        refresh_token = RefreshToken(
+            person_id=person_id,
+            email_id=email_id,
+            token_hash=self.hash_token(token),
+            expires_on=datetime.utcnow() + timedelta(seconds=int(self.config.REFRESH_TOKEN_EXPIRE)),
+        )
+        refresh_token.family_id = family_id or refresh_token.entity_id
+        self.refresh_token_repo.save(refresh_token)
+        return token, refresh_token
+
+    def rotate_refresh_token(self, token: str) -> tuple[str, RefreshToken]:
+        """
+        Exchange a refresh token for a new one in the same family.
+
+        A token that was already used is treated as stolen: its whole family is revoked,
+        which also logs out whoever holds the latest token of that family, along with
+        every access token of the person.
+
+        :param token: The refresh token presented by the client
+        :return: The new token and its stored record
+        """
+        refresh_token = self.refresh_token_repo.get_one({"token_hash": self.hash_token(token)})
+        if not refresh_token or refresh_token.revoked_on or refresh_token.expires_on <= datetime.utcnow():
+            raise APIException("Refresh token is invalid or expired.")
+
+        if refresh_token.used_on or not self.refresh_token_repo.mark_as_used(refresh_token):
+            logger.warning(f"Refresh token reuse detected, revoking token family {refresh_token.family_id}")
+            self.refresh_token_repo.revoke(refresh_token.person_id, family_id=refresh_token.family_id)
+            self.access_token_revocation_service.revoke_access_tokens(refresh_token.person_id)
+            raise APIException("Refresh token is invalid or expired.")
+
+        return self.issue_refresh_token(
+            refresh_token.person_id, refresh_token.email_id, family_id=refresh_token.family_id
+        )
+
+    def revoke_refresh_tokens(self, person_id: str) -> None:
+        """Revoke every refresh token of a person, e.g. after their password changes."""
+        self.refresh_token_repo.revoke(person_id)
@@ -1,6 +1,8 @@
+from datetime import datetime
+from typing import Iterator, Optional, Union
 from uuid import UUID
 from common.repositories.factory import RepositoryFactory, RepoType
-from common.models.todo import Todo
+from common.models.todo import Todo, TodoRow
 from app.helpers.exceptions import InputValidationError
 
 
@@ -43,9 +45,17 @@ class TodoService:
         todo = self.get_todo_by_id(entity_id)
         if not todo:
             raise InputValidationError("Todo not found")
-        if todo:
-            todo.is_completed = not todo.is_completed
-            self.todo_repo.save(todo)
+        return self.toggle_todo(todo)
+
+    def toggle_todo(self, todo: Todo) -> Todo:
+        """
+        Toggle the completion status of an already loaded todo.
+
+        :param todo: Todo to toggle
+        :return: Updated Todo object
+        """
+        todo.is_completed = not todo.is_completed
+        self.todo_repo.save(todo)
         return todo
 
     def update_todo_by_id(self, entity_id: str, title: str, is_completed: bool) -> Todo:
@@ -60,11 +70,104 @@ class TodoService:
         todo = self.get_todo_by_id(entity_id)
         if not todo:
             raise InputValidationError("Todo not found")
+        return self.update_todo(todo, title, is_completed)
+
+    def update_todo(self, todo: Todo, title: str, is_completed: bool) -> Todo:
+        """
+        Update an already loaded todo item.
+
+        :param todo: Todo to update
+        :param title: New title for the todo
+        :param is_completed: New completion status for the todo
+        :return: Updated Todo object
+        """
         todo.title = title
         todo.is_completed = is_completed
         self.todo_repo.save(todo)
         return todo
 
+    BATCH_OPERATIONS = ("create", "toggle", "update", "delete")
+
+    def apply_batch(self, person_id: str, operations: list[dict]) -> list[dict]:
+        """
+        Apply an ordered list of todo operations for a person and save the result in one transaction.
+
+        Supported operations are `{"op": "create", "title": ...}`,
+        `{"op": "toggle", "todo_id": ...}`, `{"op": "update", "todo_id": ..., "title": ..., "is_completed": ...}`
+        (either field may be omitted) and `{"op": "delete", "todo_id": ...}`.
+
+        All referenced todos are loaded with a single query and every touched todo is written once.
+        An invalid operation fails on its own and is reported in its result; the remaining
+        operations are still applied.
+
+        :param person_id: ID of the person owning the todos
+        :param operations: Operations to apply, in order
+        :return: One result per operation, in order, with each todo in its state after the batch
+        """
+        todo_ids = list({
+            operation["todo_id"] for operation in operations
+            if isinstance(operation, dict) and isinstance(operation.get("todo_id"), str)
+        })
+        todos = {}
+        if todo_ids:
+            todos = {
+                todo.entity_id: todo
+                for todo in self.todo_repo.get_many({"entity_id": todo_ids, "person_id": person_id})
+            }
+
+        touched = {}
+        results = []
+        for index, operation in enumerate(operations):
+            op = operation.get("op") if isinstance(operation, dict) else None
+            error = self._get_batch_operation_error(op, operation)
+            if error:
+                results.append({"index": index, "op": op, "success": False, "message": error})
+                continue
+
+            if op == "create":
+                todo = Todo(person_id=person_id, title=operation["title"])
+                todos[todo.entity_id] = todo
+            else:
+                todo = todos.get(operation["todo_id"])
+                if not todo or not todo.active:
+                    results.append({"index": index, "op": op, "success": False, "message": "Todo not found"})
+                    continue
+
+                if op == "toggle":
+                    todo.is_completed = not todo.is_completed
+                elif op == "update":
+                    if "title" in operation:
+                        todo.title = operation["title"]
+                    if "is_completed" in operation:
+                        todo.is_completed = operation["is_completed"]
+                else:
+                    todo.active = False
+
+            todo.changed_by_id = person_id
+            touched[todo.entity_id] = todo
+            results.append({"index": index, "op": op, "success": True, "todo": todo})
+
+        self.todo_repo.save_many(list(touched.values()))
+
+        for result in results:
+            if result.get("op") == "delete" and result["success"]:
+                result["todo"] = {"entity_id": result["todo"].entity_id}
+        return results
+
+    def _get_batch_operation_error(self, op, operation) -> Optional[str]:
+        """Why a batch operation cannot be applied, or None. Field types are checked, never coerced."""
+        if not isinstance(op, str) or op not in self.BATCH_OPERATIONS:
+            return "Unknown operation"
+        if op != "create" and not isinstance(operation.get("todo_id"), str):
+            return "'todo_id' must be a string."
+        if op == "create" or (op == "update" and "title" in operation):
+            title = operation.get("title")
+            if not isinstance(title, str) or not title.strip():
+                return "'title' is required and cannot be empty."
+        if op == "update" and "is_completed" in operation and not isinstance(operation["is_completed"], bool):
+            return "'is_completed' must be a boolean."
+        return None
+
     def delete_todo_by_id(self, entity_id: str) -> None:
         self.todo_repo.delete(entity_id)
 
@@ -77,6 +180,54 @@ class TodoService:
         """
         return self.todo_repo.get_many({"person_id": person_id}, sort=[("created_on", 'asc')])
 
+    def get_todo_rows_by_person(self, person_id: str, filter_type: str = "all") -> list[TodoRow]:
+        """
+        Get a person's todos as read-only rows, for list responses.
+
+        :param person_id: ID of the person
+        :param filter_type: One of "all", "active" or "completed"
+        :return: List of TodoRow objects
+        """
+        is_completed = {"completed": True, "active": False}.get(filter_type)
+        return self.todo_repo.get_todo_rows_by_person(person_id, is_completed=is_completed)
+
+    def iter_todos_by_person(self, person_id: str, filter_type: str = "all") -> Iterator[list[TodoRow]]:
+        """
+        Iterate over all todos for a person in batches of read-only rows, for streaming large lists.
+
+        :param person_id: ID of the person
+        :param filter_type: One of "all", "active" or "completed"
+        :return: Iterator of TodoRow batches
+        """
+        is_completed = {"completed": True, "active": False}.get(filter_type)
+        return self.todo_repo.iter_todos_by_person(
+            person_id, is_completed=is_completed, batch_size=self.config.TODO_STREAM_BATCH_SIZE
+        )
+
+    def get_changes_since(
+            self, person_id: str, since: Union[int, datetime] = None
+    ) -> tuple[list[TodoRow], Union[int, datetime], bool]:
+        """
+        Get the todos a person created, updated or deleted after a watermark.
+
+        Deleted todos are returned with `active` set to false so clients can drop them.
+        Watermarks are change sequence numbers; a `datetime` watermark handed out before them is
+        still accepted, and may return changes the client already has once.
+
+        :param person_id: ID of the person
+        :param since: Watermark returned by the previous call, or None for a full sync
+        :return: Changed todos, the next watermark and whether more changes are pending
+        """
+        page_size = self.config.TODO_CHANGES_PAGE_SIZE
+        if isinstance(since, datetime):
+            changes = self.todo_repo.get_changes_since(person_id, changed_since=since, limit=page_size + 1)
+        else:
+            changes = self.todo_repo.get_changes_since(person_id, after=since, limit=page_size + 1)
+        has_more = len(changes) > page_size
+        changes = changes[:page_size]
+        watermark = changes[-1][0] if changes else since
+        return [todo for _, todo in changes], watermark, has_more
+
     def get_completed_todos(self, person_id: str = None) -> list[Todo]:
         """
         Get all completed todos, optionally filtered by person.
@@ -109,7 +260,8 @@ class TodoService:
         """
         completed_todos = self.get_completed_todos(person_id)
         for todo in completed_todos:
-            self.todo_repo.delete(todo)
+            todo.active = False
+        self.todo_repo.save_many(completed_todos)
 
 
     def complete_all_todos(self, person_id: str) -> None:
@@ -121,7 +273,7 @@ class TodoService:
         active_todos = self.get_active_todos(person_id)
         for todo in active_todos:
             todo.is_completed = True
-            self.todo_repo.save(todo)
+        self.todo_repo.save_many(active_todos)
 
     def activate_all_todos(self, person_id: str) -> None:
         """
@@ -132,4 +284,4 @@ class TodoService:
         completed_todos = self.get_completed_todos(person_id)
         for todo in completed_todos:
             todo.is_completed = False
-            self.todo_repo.save(todo)
\ No newline at end of file
+        self.todo_repo.save_many(completed_todos)
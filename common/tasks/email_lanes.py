@@ -0,0 +1,69 @@
+from enum import Enum
+
+from common.app_config import config
+
+
+class EmailLaneEnum(Enum):
+    PRIORITY = "PRIORITY"
+    BULK = "BULK"
+
+
+# Events not listed here go to the bulk lane.
+EMAIL_EVENT_LANES = {
+    "RESET_PASSWORD": EmailLaneEnum.PRIORITY,
+    "WELCOME_EMAIL": EmailLaneEnum.BULK,
+}
+
+# Outbox priority of each lane; the outbox relay claims higher values first.
+EMAIL_LANE_PRIORITIES = {
+    EmailLaneEnum.PRIORITY: 10,
+    EmailLaneEnum.BULK: 0,
+}
+
+
+def get_email_lane(event: str) -> EmailLaneEnum:
+    return EMAIL_EVENT_LANES.get(event, EmailLaneEnum.BULK)
+
+
+def get_email_lane_queue_name(lane: EmailLaneEnum) -> str:
+    if lane == EmailLaneEnum.PRIORITY:
+        return config.QUEUE_NAME_PREFIX + config.EMAIL_SERVICE_PROCESSOR_PRIORITY_QUEUE_NAME
+    return config.QUEUE_NAME_PREFIX + config.EMAIL_SERVICE_PROCESSOR_QUEUE_NAME
+
+
+def get_email_dead_letter_queue_name() -> str:
+    return config.QUEUE_NAME_PREFIX + config.EMAIL_SERVICE_PROCESSOR_DEAD_LETTER_QUEUE_NAME
+
+
+def declare_email_lanes(channel) -> None:
+    """
+    Declare the lane queues and the dead-letter queue.
+
+    Dead-lettering itself is configured by the `email-dead-letter` policy set in
+    `services/rabbitmq/init.sh`, so the queues are declared without arguments and stay
+    compatible with the email transmitter's own declarations.
+    """
+    for lane in EmailLaneEnum:
+        channel.queue_declare(queue=get_email_lane_queue_name(lane), durable=True)
+    channel.queue_declare(queue=get_email_dead_letter_queue_name(), durable=True)
+
+
+def get_email_lane_depths(channel) -> dict:
+    """
+    Return the number of ready messages and consumers of each lane and of the dead-letter queue.
+
+    :param channel: An open pika channel
+    :return: Dictionary keyed by lane name ("dead_letter" for the dead-letter queue)
+    """
+    queues = {lane.value.lower(): get_email_lane_queue_name(lane) for lane in EmailLaneEnum}
+    queues["dead_letter"] = get_email_dead_letter_queue_name()
+
+    depths = {}
+    for name, queue_name in queues.items():
+        result = channel.queue_declare(queue=queue_name, durable=True, passive=True)
+        depths[name] = {
+            "queue": queue_name,
+            "messages": result.method.message_count,
+            "consumers": result.method.consumer_count,
+        }
+    return depths
@@ -0,0 +1,115 @@
+import json
+import time
+
+import pika
+from prometheus_client import start_http_server
+
+from common.app_config import config
+from common.app_logger import logger
+from common.models.outbox_message import OutboxMessage
+from common.services.outbox_message import OutboxMessageService
+from common.tasks.email_lanes import declare_email_lanes, get_email_lane_depths
+from common.tasks.send_message import get_connection_parameters, establish_connection
+from common.utils.metrics import EMAIL_LANE_CONSUMERS, EMAIL_LANE_MESSAGES, track_publish
+
+
+class OutboxRelay:
+    """
+    Polls the `outbox_message` table and publishes pending messages to RabbitMQ.
+
+    Any number of relay processes can run side by side; each batch is claimed with
+    `FOR UPDATE SKIP LOCKED` and only marked as sent once the broker has committed it.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.batch_size = config.OUTBOX_RELAY_BATCH_SIZE
+        self.poll_interval = config.OUTBOX_RELAY_POLL_INTERVAL
+        self.metrics_interval = config.OUTBOX_RELAY_METRICS_INTERVAL
+        self.outbox_message_service = OutboxMessageService(config)
+
+        self.parameters = get_connection_parameters()
+        self.connection = None
+        self.channel = None
+        self.declared_queues = set()
+
+    def _get_channel(self):
+        if self.channel is None or self.channel.is_closed:
+            self.connection = establish_connection(self.parameters)
+            self.channel = self.connection.channel()
+            self.channel.tx_select()
+            declare_email_lanes(self.channel)
+            self.declared_queues = set()
+        return self.channel
+
+    def _close_connection(self):
+        if self.connection is not None and self.connection.is_open:
+            self.connection.close()
+        self.connection = None
+        self.channel = None
+
+    @track_publish("outbox_relay")
+    def publish(self, messages: list[OutboxMessage]) -> None:
+        """
+        Publish messages in a single AMQP transaction, so the whole batch is acknowledged
+        by one commit round trip. Raises if the broker rejects the commit.
+
+        :param messages: Outbox messages to publish
+        """
+        channel = self._get_channel()
+        for message in messages:
+            if message.queue_name not in self.declared_queues:
+                channel.queue_declare(queue=message.queue_name, durable=True)
+                self.declared_queues.add(message.queue_name)
+
+            channel.basic_publish(
+                exchange="",
+                routing_key=message.queue_name,
+                body=json.dumps(message.payload).encode(),
+                properties=pika.BasicProperties(
+                    delivery_mode=2,  # Make the message persistent
+                    message_id=message.entity_id,
+                ),
+            )
+        channel.tx_commit()
+        logger.info(f"Relayed {len(messages)} outbox messages")
+
+    def relay_once(self) -> int:
+        return self.outbox_message_service.relay_pending_messages(self.publish, self.batch_size)
+
+    def log_email_lane_depths(self) -> None:
+        """Log and export the depth of each email lane so the email transmitter consumers can be sized."""
+        for lane, depth in get_email_lane_depths(self._get_channel()).items():
+            EMAIL_LANE_MESSAGES.labels(lane).set(depth['messages'])
+            EMAIL_LANE_CONSUMERS.labels(lane).set(depth['consumers'])
+            logger.info(
+                f"Email lane {lane} ({depth['queue']}): {depth['messages']} messages, {depth['consumers']} consumers"
+            )
+
+    def run(self):
+        logger.info("Outbox relay started")
+        if self.config.OUTBOX_RELAY_METRICS_PORT:
+            start_http_server(self.config.OUTBOX_RELAY_METRICS_PORT)
+        last_metrics_time = 0
+        while True:
+            try:
+                relayed = self.relay_once()
+                if time.monotonic() - last_metrics_time >= self.metrics_interval:
+                    self.log_email_lane_depths()
+                    last_metrics_time = time.monotonic()
+            except Exception as e:
+                logger.exception(e)
+                self._close_connection()
+                relayed = 0
+
+            # Keep draining while batches come back full, otherwise wait for new messages.
+            if relayed < self.batch_size:
+                time.sleep(self.poll_interval)
+
+
+def main():
+    OutboxRelay(config).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,25 @@
+import os
 import pika
 import json
 import time
+import uuid
 from pika.exchange_type import ExchangeType
 
 from common.app_config import config
 from common.app_logger import logger
+from common.utils.circuit_breaker import CircuitBreaker, CircuitBreakerState
+from common.utils.metrics import MESSAGES_SPOOLED, track_publish
+from common.utils.request_timing import timed_call
+
+
+# Shared by every connection attempt in the process so a broker outage trips it once for all callers.
+broker_circuit_breaker = CircuitBreaker(
+    "rabbitmq",
+    failure_threshold=config.BROKER_CIRCUIT_FAILURE_THRESHOLD,
+    recovery_timeout=config.BROKER_CIRCUIT_RECOVERY_TIMEOUT,
+    half_open_max_calls=config.BROKER_CIRCUIT_HALF_OPEN_MAX_CALLS,
+)
+os.register_at_fork(after_in_child=broker_circuit_breaker.reset_after_fork)
 
 
 def get_connection_parameters() -> pika.ConnectionParameters:
@@ -19,52 +34,216 @@ def get_connection_parameters() -> pika.ConnectionParameters:
     )
 
 def establish_connection(parameters: pika.ConnectionParameters, max_retries: int = 10) -> pika.BlockingConnection:
+    """
+    Connect to RabbitMQ, retrying with exponential backoff.
+
+    Every attempt goes through `broker_circuit_breaker`; once it opens, retrying stops
+    and `CircuitBreakerOpenError` is raised straight away instead of sleeping.
+    """
     retries = 0
     while retries < max_retries:
+        broker_circuit_breaker.before_call()
         try:
             connection = pika.BlockingConnection(parameters)
+            broker_circuit_breaker.record_success()
             return connection
         except Exception as e:
+            broker_circuit_breaker.record_failure()
             logger.debug(f"Could not connect to messaging system. Retries {retries}")
             retries += 1
+            if broker_circuit_breaker.state != CircuitBreakerState.CLOSED:
+                logger.error("Giving up connecting to RabbitMQ, the broker circuit is open")
+                raise e
             if retries < max_retries:
                 time.sleep(2 ** retries)
             else:
                 logger.error("Error connecting to RabbitMQ after multiple retries")
                 raise e
 
+
+class MessageSpool:
+    """
+    A local directory of messages that could not be sent while the broker circuit was open.
+
+    Each message is stored in its own file, so concurrent writers never contend; files are
+    claimed by renaming them before they are replayed, so concurrent drains never send one twice.
+    A claim older than `claim_timeout` seconds belongs to a drain that died before removing
+    the file, and is released so the message is replayed (possibly a second time) rather than lost.
+    """
+
+    def __init__(self, spool_dir: str, claim_timeout: float = 300.0):
+        self.spool_dir = spool_dir
+        self.claim_timeout = claim_timeout
+        os.makedirs(spool_dir, exist_ok=True)
+
+    def write(self, queue_name: str, data: dict, properties: pika.BasicProperties = None, exchange_name: str = None) -> None:
+        message = {
+            "queue_name": queue_name,
+            "data": data,
+            "properties": vars(properties) if properties is not None else None,
+            "exchange_name": exchange_name,
+        }
+        file_name = f"{time.time_ns()}-{uuid.uuid4().hex}.json"
+        tmp_path = os.path.join(self.spool_dir, file_name + ".tmp")
+        with open(tmp_path, "w") as fp:
+            json.dump(message, fp)
+        os.rename(tmp_path, os.path.join(self.spool_dir, file_name))
+        MESSAGES_SPOOLED.inc()
+
+    def has_messages(self) -> bool:
+        self._release_stale_claims()
+        return any(file_name.endswith(".json") for file_name in os.listdir(self.spool_dir))
+
+    def _release_stale_claims(self) -> None:
+        stale_before = time.time() - self.claim_timeout
+        for file_name in os.listdir(self.spool_dir):
+            if not file_name.endswith(".json.sending"):
+                continue
+            claimed_path = os.path.join(self.spool_dir, file_name)
+            try:
+                if os.stat(claimed_path).st_mtime < stale_before:
+                    os.rename(claimed_path, claimed_path[:-len(".sending")])
+                    logger.warning(f"Released spooled message {file_name} claimed by a drain that did not finish")
+            except FileNotFoundError:
+                continue  # Sent or released meanwhile
+
+    def drain(self, send) -> int:
+        """
+        Replay spooled messages in the order they were written.
+
+        :param send: Callable taking (queue_name, data, properties, exchange_name)
+        :return: Number of messages replayed
+        """
+        self._release_stale_claims()
+        sent = 0
+        for file_name in sorted(os.listdir(self.spool_dir)):
+            if not file_name.endswith(".json"):
+                continue
+            path = os.path.join(self.spool_dir, file_name)
+            claimed_path = path + ".sending"
+            try:
+                # Renaming keeps the write time; touched first so the claim's age counts from now.
+                os.utime(path)
+                os.rename(path, claimed_path)
+            except FileNotFoundError:
+                continue  # Claimed by another drain
+
+            with open(claimed_path) as fp:
+                message = json.load(fp)
+            properties = pika.BasicProperties(**message["properties"]) if message["properties"] else None
+            try:
+                send(message["queue_name"], message["data"], properties, message["exchange_name"])
+            except Exception:
+                os.rename(claimed_path, path)
+                raise
+            os.remove(claimed_path)
+            sent += 1
+
+        if sent:
+            logger.info(f"Replayed {sent} spooled messages")
+        return sent
+
+
 class MessageSender:
     def __init__(self):
         self.parameters = get_connection_parameters()
+        self.spool = (
+            MessageSpool(config.MESSAGE_SPOOL_DIR, config.MESSAGE_SPOOL_CLAIM_TIMEOUT) if config.MESSAGE_SPOOL_DIR else None
+        )
 
+    @track_publish("send_message")
+    @timed_call("publish")
     def send_message(self, queue_name: str, data: dict, properties: pika.BasicProperties = None, exchange_name: str = None) -> None:
         """
         Sends a message to the specified RabbitMQ queue.
 
+        While the broker circuit is open the message is written to the local spool if one
+        is configured, and replayed by the next send that reaches the broker; otherwise
+        the connection error (or `CircuitBreakerOpenError`) is raised.
+
         :param queue_name: Name of the RabbitMQ queue to send the message to.
         :param data: The data to send to the queue as a dictionary.
         :return: None
         """
-        connection = establish_connection(self.parameters)
+        try:
+            connection = establish_connection(self.parameters, max_retries=config.BROKER_CONNECT_MAX_RETRIES)
+        except Exception:
+            if self.spool is None or broker_circuit_breaker.state == CircuitBreakerState.CLOSED:
+                raise
+            self.spool.write(queue_name, data, properties, exchange_name)
+            logger.warning(f"Broker circuit is open, spooled message for queue: {queue_name}")
+            return
+
+        with connection:
+            channel = connection.channel()
+            self._publish(channel, queue_name, data, properties, exchange_name)
+            logger.info(f"Sent message to queue: {queue_name}")
+
+            if self.spool is not None and self.spool.has_messages():
+                self.spool.drain(lambda *message: self._publish(channel, *message))
+
+    @track_publish("send_messages")
+    @timed_call("publish")
+    def send_messages(self, messages: list[tuple[str, dict]], properties: pika.BasicProperties = None, exchange_name: str = None) -> None:
+        """
+        Sends many messages over a single connection and channel.
+
+        The batch is published inside an AMQP transaction, so the broker acknowledges all
+        of it with one commit round trip instead of one confirm per message. Spooling
+        while the broker circuit is open works as in `send_message`.
+
+        :param messages: (queue_name, data) pairs to send, in order.
+        :return: None
+        """
+        if not messages:
+            return
+
+        try:
+            connection = establish_connection(self.parameters, max_retries=config.BROKER_CONNECT_MAX_RETRIES)
+        except Exception:
+            if self.spool is None or broker_circuit_breaker.state == CircuitBreakerState.CLOSED:
+                raise
+            for queue_name, data in messages:
+                self.spool.write(queue_name, data, properties, exchange_name)
+            logger.warning(f"Broker circuit is open, spooled {len(messages)} messages")
+            return
 
         with connection:
             channel = connection.channel()
+            channel.tx_select()
 
-            if properties is None:
-                properties = pika.BasicProperties(
-                    delivery_mode=2,  # Make the message persistent
+            declared_queues = set()
+            for queue_name, data in messages:
+                self._publish(
+                    channel, queue_name, data, properties, exchange_name,
+                    declare=queue_name not in declared_queues
                 )
+                declared_queues.add(queue_name)
 
-            if exchange_name is None:
-                exchange_name = ""
-            else:
-                channel.exchange_declare(exchange=exchange_name, exchange_type=ExchangeType.topic.value, durable=True)
+            channel.tx_commit()
+            logger.info(f"Sent batch of {len(messages)} messages")
 
-            channel.queue_declare(queue=queue_name, durable=True)
-            channel.basic_publish(
-                exchange=exchange_name,
-                routing_key=queue_name,
-                body=json.dumps(data).encode(),
-                properties=properties,
+    def _publish(
+            self, channel, queue_name: str, data: dict, properties: pika.BasicProperties = None,
+            exchange_name: str = None, declare: bool = True
+    ) -> None:
+        if properties is None:
+            properties = pika.BasicProperties(
+                delivery_mode=2,  # Make the message persistent
             )
-            logger.info(f"Sent message to queue: {queue_name}")
+
+        if exchange_name is None:
+            exchange_name = ""
+        elif declare:
+            channel.exchange_declare(exchange=exchange_name, exchange_type=ExchangeType.topic.value, durable=True)
+
+        if declare:
+            channel.queue_declare(queue=queue_name, durable=True)
+        channel.basic_publish(
+            exchange=exchange_name,
+            routing_key=queue_name,
+            body=json.dumps(data).encode(),
+            properties=properties,
+        )
+        logger.debug(f"Sent message to queue: {queue_name}")
+
@@ -0,0 +1,119 @@
+import threading
+import time
+from enum import Enum
+
+from common.app_logger import logger
+
+
+class CircuitBreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreakerOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    A thread-safe circuit breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens and every call
+    fails fast with `CircuitBreakerOpenError`. Once `recovery_timeout` seconds have
+    passed it moves to half-open and lets up to `half_open_max_calls` trial calls
+    through; a success closes it again and a failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = CircuitBreakerState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+        self.trip_count = 0
+        self.failure_count = 0
+        self.rejected_count = 0
+
+    @property
+    def state(self) -> CircuitBreakerState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitBreakerState:
+        if self._state == CircuitBreakerState.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = CircuitBreakerState.HALF_OPEN
+            self._half_open_calls = 0
+            logger.info(f"Circuit breaker '{self.name}' is half-open")
+        return self._state
+
+    def _trip(self):
+        self._state = CircuitBreakerState.OPEN
+        self._opened_at = time.monotonic()
+        self.trip_count += 1
+        logger.error(f"Circuit breaker '{self.name}' opened after {self._consecutive_failures} consecutive failures")
+
+    def before_call(self) -> None:
+        """Raise `CircuitBreakerOpenError` if the call must not be attempted."""
+        with self._lock:
+            state = self._current_state()
+            if state == CircuitBreakerState.OPEN:
+                self.rejected_count += 1
+                raise CircuitBreakerOpenError(f"Circuit breaker '{self.name}' is open")
+            if state == CircuitBreakerState.HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    self.rejected_count += 1
+                    raise CircuitBreakerOpenError(f"Circuit breaker '{self.name}' is half-open and a trial call is in progress")
+                self._half_open_calls += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CircuitBreakerState.CLOSED:
+                logger.info(f"Circuit breaker '{self.name}' closed")
+            self._state = CircuitBreakerState.CLOSED
+            self._consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failure_count += 1
+            self._consecutive_failures += 1
+            state = self._current_state()
+            if state == CircuitBreakerState.HALF_OPEN or (
+                state == CircuitBreakerState.CLOSED and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._trip()
+
+    def call(self, func, *args, **kwargs):
+        """Run `func` through the breaker, recording its outcome."""
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def reset_after_fork(self) -> None:
+        """Give a forked child process its own lock and a closed breaker."""
+        self._lock = threading.Lock()
+        self._state = CircuitBreakerState.CLOSED
+        self._consecutive_failures = 0
+        self._half_open_calls = 0
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._current_state().value,
+                "consecutive_failures": self._consecutive_failures,
+                "trip_count": self.trip_count,
+                "failure_count": self.failure_count,
+                "rejected_count": self.rejected_count,
+            }
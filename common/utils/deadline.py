@@ -0,0 +1,81 @@
+import time
+from typing import Optional
+
+
+# Sent when a request with a deadline takes its connection, and again every STATEMENT_TIMEOUT_REFRESH seconds.
+STATEMENT_TIMEOUT_QUERY = "SELECT set_config('statement_timeout', %s, false);"
+# Sent once the request is done with its connection, before it goes back to the pool.
+RESET_STATEMENT_TIMEOUT_QUERY = "RESET statement_timeout;"
+# A statement may outlive the deadline by up to this long (seconds), in exchange for one round trip per request.
+STATEMENT_TIMEOUT_REFRESH = 0.5
+
+
+class DeadlineExceededError(Exception):
+    pass
+
+
+def _get_request_globals():
+    # Deadlines only exist while handling a request; outside a Flask app context there is none.
+    try:
+        from flask import g, has_app_context
+    except ImportError:
+        return None
+    return g if has_app_context() else None
+
+
+def set_deadline(seconds: float) -> None:
+    """Give the current request `seconds` to finish."""
+    g = _get_request_globals()
+    if g is not None:
+        g.deadline = time.monotonic() + seconds
+
+
+def get_remaining_time() -> Optional[float]:
+    """Seconds left in the current request's budget, or None if it has no deadline."""
+    g = _get_request_globals()
+    deadline = getattr(g, "deadline", None) if g is not None else None
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline() -> Optional[float]:
+    """Raise `DeadlineExceededError` if the current request is out of time, else return the time left."""
+    remaining = get_remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceededError("The request did not finish within its time budget")
+    return remaining
+
+
+def apply_statement_timeout(connection) -> None:
+    """
+    Limit statements on `connection` to the time left in the current request.
+
+    The timeout is set for the session, so the commits rococo makes partway through a save
+    do not end it. A request keeps one pooled connection, so it is only set again once
+    `STATEMENT_TIMEOUT_REFRESH` seconds have passed; `reset_statement_timeout` must run
+    before the connection goes back to the pool.
+    """
+    remaining = check_deadline()
+    if remaining is None:
+        return
+    g = _get_request_globals()
+    applied_at = g.get("statement_timeout_applied_at")
+    if applied_at is not None and time.monotonic() - applied_at < STATEMENT_TIMEOUT_REFRESH:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(STATEMENT_TIMEOUT_QUERY, (str(max(int(remaining * 1000), 1)),))
+    g.statement_timeout_applied_at = time.monotonic()
+
+
+def reset_statement_timeout(connection) -> None:
+    """Undo `apply_statement_timeout` on `connection`, so it does not carry over to the next request."""
+    g = _get_request_globals()
+    if g is None or g.pop("statement_timeout_applied_at", None) is None:
+        return
+    # Whatever the request left uncommitted is rolled back by the pool anyway; a reset
+    # inside that transaction would be rolled back with it.
+    connection.rollback()
+    with connection.cursor() as cursor:
+        cursor.execute(RESET_STATEMENT_TIMEOUT_QUERY)
+    connection.commit()
@@ -0,0 +1,77 @@
+import time
+
+import psycopg2.extensions
+
+COMMIT = "COMMIT"
+ROLLBACK = "ROLLBACK"
+
+# Called as listener(query, vars, seconds) after every statement run through an InstrumentedCursor.
+_query_listeners = []
+
+
+def add_query_listener(listener) -> None:
+    _query_listeners.append(listener)
+
+
+def remove_query_listener(listener) -> None:
+    _query_listeners.remove(listener)
+
+
+def notify_query_listeners(query, vars, seconds: float) -> None:
+    """Report a statement to the query listeners; for connections that are not `InstrumentedConnection`s."""
+    for listener in _query_listeners:
+        listener(query, vars, seconds)
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """A cursor that reports every statement it runs, and how long it took, to the query listeners."""
+
+    def execute(self, query, vars=None):
+        if not _query_listeners:
+            return super().execute(query, vars)
+        started_at = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            notify_query_listeners(query, vars, time.perf_counter() - started_at)
+
+    def executemany(self, query, vars_list):
+        if not _query_listeners:
+            return super().executemany(query, vars_list)
+        started_at = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            notify_query_listeners(query, vars_list, time.perf_counter() - started_at)
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    """
+    A psycopg2 connection whose cursors are `InstrumentedCursor`s.
+
+    Commits and rollbacks are reported too, as the statements "COMMIT" and "ROLLBACK".
+    Pass it as `connection_factory` when connecting. With no listeners added a statement
+    costs one extra list check.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor_factory = InstrumentedCursor
+
+    def commit(self):
+        if not _query_listeners:
+            return super().commit()
+        started_at = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            notify_query_listeners(COMMIT, None, time.perf_counter() - started_at)
+
+    def rollback(self):
+        if not _query_listeners:
+            return super().rollback()
+        started_at = time.perf_counter()
+        try:
+            return super().rollback()
+        finally:
+            notify_query_listeners(ROLLBACK, None, time.perf_counter() - started_at)
@@ -0,0 +1,151 @@
+"""
+Prometheus metrics, served by the API on `METRICS_PORT` and by the outbox relay on `OUTBOX_RELAY_METRICS_PORT`.
+
+Counters and histograms are updated where the work happens. State that only an object
+knows (pool sizes, the broker circuit, the password hasher) is copied into gauges from time
+to time, see `app.helpers.metrics`. An update takes one short lock on the metric's value,
+held for a single addition, so request threads barely contend on it.
+
+Under gunicorn each worker writes its values to memory-mapped files in
+`PROMETHEUS_MULTIPROC_DIR` (set by docker-entrypoint.sh), and the master, which serves
+`METRICS_PORT`, aggregates the files of all of them. Gauges declare how they aggregate:
+`livesum`/`livemax` only count running workers, `sum` keeps the totals of exited ones.
+"""
+import time
+from functools import wraps
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from common.app_config import config
+
+ENABLED = config.METRICS_ENABLED
+
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Time to answer a request, up to the first byte of a streamed body',
+    ['route', 'method', 'status'],
+)
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds',
+    'Time per SQL round trip (commits included), by the repository method that ran it',
+    ['repository', 'method'],
+    buckets=DB_BUCKETS,
+)
+MESSAGE_PUBLISH_DURATION = Histogram(
+    'message_publish_duration_seconds',
+    'Time to publish a message or batch to RabbitMQ, connecting included',
+    ['operation'],
+)
+MESSAGE_PUBLISH_FAILURES = Counter(
+    'message_publish_failures',
+    'Publishes that raised, after retries and spooling',
+    ['operation'],
+)
+MESSAGES_SPOOLED = Counter(
+    'messages_spooled',
+    'Messages written to the local spool while the broker circuit was open',
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections',
+    'Connections of the request pool, by state (in_use, idle)',
+    ['state'],
+    multiprocess_mode='livesum',
+)
+DB_POOL_MAX_CONNECTIONS = Gauge(
+    'db_pool_max_connections',
+    'Most connections the request pool opens (0 is unlimited)',
+    multiprocess_mode='livesum',
+)
+BROKER_CIRCUIT_STATE = Gauge(
+    'broker_circuit_state',
+    'State of the broker circuit: 0 closed, 1 half open, 2 open',
+    multiprocess_mode='livemax',
+)
+BROKER_CIRCUIT_TRIPS = Gauge(
+    'broker_circuit_trips',
+    'Times the broker circuit has opened',
+    multiprocess_mode='sum',
+)
+PASSWORD_HASH_JOBS = Gauge(
+    'password_hash_jobs',
+    'Password hashing jobs, by outcome (completed, rejected)',
+    ['outcome'],
+    multiprocess_mode='sum',
+)
+PASSWORD_HASH_SECONDS = Gauge(
+    'password_hash_seconds',
+    'Time password hashing jobs spent, by phase (queue, run)',
+    ['phase'],
+    multiprocess_mode='sum',
+)
+TODO_CHANGE_SUBSCRIBERS = Gauge(
+    'todo_change_stream_subscribers',
+    'Open todo change streams',
+    multiprocess_mode='livesum',
+)
+REVOCATION_LIST_ENTRIES = Gauge(
+    'auth_revocation_list_entries',
+    'People in the cached access token revocation list',
+    multiprocess_mode='livemax',
+)
+COMPRESSION_RESPONSES = Gauge(
+    'compression_responses',
+    'Responses compressed, by route and encoding',
+    ['route', 'encoding'],
+    multiprocess_mode='sum',
+)
+COMPRESSION_ORIGINAL_BYTES = Gauge(
+    'compression_original_bytes',
+    'Bytes of compressed responses before compression, by route and encoding',
+    ['route', 'encoding'],
+    multiprocess_mode='sum',
+)
+COMPRESSION_COMPRESSED_BYTES = Gauge(
+    'compression_compressed_bytes',
+    'Bytes of compressed responses after compression, by route and encoding',
+    ['route', 'encoding'],
+    multiprocess_mode='sum',
+)
+COMPRESSION_CPU_SECONDS = Gauge(
+    'compression_cpu_seconds',
+    'CPU time spent compressing responses, by route and encoding',
+    ['route', 'encoding'],
+    multiprocess_mode='sum',
+)
+EMAIL_LANE_MESSAGES = Gauge(
+    'email_lane_messages',
+    'Ready messages in each email lane queue',
+    ['lane'],
+    multiprocess_mode='livemax',
+)
+EMAIL_LANE_CONSUMERS = Gauge(
+    'email_lane_consumers',
+    'Consumers of each email lane queue',
+    ['lane'],
+    multiprocess_mode='livemax',
+)
+
+
+def track_publish(operation: str):
+    """Decorator recording the duration and failures of a publishing function under `operation`."""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started_at = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                MESSAGE_PUBLISH_FAILURES.labels(operation).inc()
+                raise
+            finally:
+                MESSAGE_PUBLISH_DURATION.labels(operation).observe(time.perf_counter() - started_at)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,130 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from common.app_config import config
+
+
+class PasswordHasherBusyError(Exception):
+    pass
+
+
+# werkzeug.security is imported in the worker that runs the job, keeping it out of app startup.
+def _hash_password(password: str, method: str) -> tuple[float, str]:
+    from werkzeug.security import generate_password_hash
+
+    started_at = time.time()
+    return started_at, generate_password_hash(password, method=method)
+
+
+def _verify_password(pwhash: str, password: str) -> tuple[float, bool]:
+    from werkzeug.security import check_password_hash
+
+    started_at = time.time()
+    return started_at, check_password_hash(pwhash, password)
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords in a dedicated process pool.
+
+    Password hashing is deliberately slow and CPU bound; running it in worker processes
+    keeps it from holding the GIL of the request threads. At most `max_pending` jobs are
+    queued or running at once; a caller that cannot get a slot within `queue_timeout`
+    seconds gets `PasswordHasherBusyError`. With no workers, hashing runs inline.
+    """
+
+    def __init__(self, method: str, workers: int = 2, max_pending: int = 32, queue_timeout: float = 5.0):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        # Pools inherited from a parent process; kept referenced so they are never shut down from here.
+        self._inherited_executors = []
+
+        self.job_count = 0
+        self.rejected_count = 0
+        self.queue_seconds = 0.0
+        self.max_queue_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def hash_password(self, password: str) -> str:
+        return self._run(_hash_password, password, self.method)
+
+    def verify_password(self, pwhash: str, password: str) -> bool:
+        return self._run(_verify_password, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """Whether `pwhash` was made with different parameters than the configured ones."""
+        return pwhash.split("$", 1)[0] != self.method
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Started lazily from a request thread: forking a threaded process could copy a lock
+                # another thread holds (a logging handler's, say) into the workers, held forever.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver")
+                )
+            return self._executor
+
+    def reset_after_fork(self) -> None:
+        """A pool is not usable from a forked child; the child starts its own on first use."""
+        if self._executor is not None:
+            self._inherited_executors.append(self._executor)
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.rejected_count += 1
+            raise PasswordHasherBusyError("Too many password hashing jobs are queued")
+        try:
+            submitted_at = time.time()
+            if self.workers:
+                started_at, result = self._get_executor().submit(func, *args).result()
+            else:
+                started_at, result = func(*args)
+            finished_at = time.time()
+        finally:
+            self._slots.release()
+
+        queue_seconds = max(started_at - submitted_at, 0.0)
+        with self._lock:
+            self.job_count += 1
+            self.queue_seconds += queue_seconds
+            self.max_queue_seconds = max(self.max_queue_seconds, queue_seconds)
+            self.run_seconds += finished_at - started_at
+        return result
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "method": self.method,
+                "workers": self.workers,
+                "job_count": self.job_count,
+                "rejected_count": self.rejected_count,
+                "queue_seconds": self.queue_seconds,
+                "max_queue_seconds": self.max_queue_seconds,
+                "run_seconds": self.run_seconds,
+            }
+
+
+# Shared by every request thread in the process so the pool bounds hashing for the whole worker.
+password_hasher = PasswordHasher(
+    method=(
+        f"scrypt:{config.PASSWORD_HASH_SCRYPT_N}:{config.PASSWORD_HASH_SCRYPT_R}:{config.PASSWORD_HASH_SCRYPT_P}"
+    ),
+    workers=config.PASSWORD_HASH_WORKERS,
+    max_pending=config.PASSWORD_HASH_MAX_PENDING,
+    queue_timeout=config.PASSWORD_HASH_QUEUE_TIMEOUT,
+)
+os.register_at_fork(after_in_child=password_hasher.reset_after_fork)
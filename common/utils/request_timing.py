@@ -0,0 +1,75 @@
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+from common.app_config import config
+
+ENABLED = config.SERVER_TIMING_ENABLED
+
+_NOT_TIMED = nullcontext()
+
+
+def _get_request_globals():
+    # Timings are collected per request; outside a Flask request there is nothing to add them to.
+    try:
+        from flask import g, has_request_context
+    except ImportError:
+        return None
+    return g if has_request_context() else None
+
+
+def record_timing(name: str, seconds: float) -> None:
+    """Add `seconds` to the current request's `name` timing."""
+    if not ENABLED:
+        return
+    g = _get_request_globals()
+    if g is None:
+        return
+    timings = g.setdefault('timings', {})
+    timing = timings.get(name)
+    if timing is None:
+        timings[name] = [seconds, 1]
+    else:
+        timing[0] += seconds
+        timing[1] += 1
+
+
+def get_request_timings() -> dict:
+    """The current request's timings as {name: [seconds, count]}."""
+    g = _get_request_globals()
+    return g.get('timings', {}) if g is not None else {}
+
+
+class _Timer:
+    __slots__ = ('name', 'started_at')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        record_timing(self.name, time.perf_counter() - self.started_at)
+
+
+def timed(name: str):
+    """Time a `with` block into the current request's `name` timing. A shared no-op when disabled."""
+    return _Timer(name) if ENABLED else _NOT_TIMED
+
+
+def timed_call(name: str):
+    """Decorator form of `timed`; the function is returned untouched when timing is disabled."""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Timer(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,110 @@
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from common.app_config import config
+
+
+class ProfilerBusyError(Exception):
+    pass
+
+
+def _get_frame_label(frame) -> str:
+    # Collapsed stacks separate frames with ';' and end with ' <count>'.
+    label = f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+    return label.replace(';', ',').replace(' ', '_')
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every thread in the process and counts them in collapsed-stack form.
+
+    Each sample reads all threads' current frames from `sys._current_frames()` while holding
+    the GIL, so a sample pauses the other threads for roughly 10-50 µs per thread; nothing is
+    traced between samples. The sampler sleeps at least `(1 - max_overhead) / max_overhead`
+    times as long as the last sample took, which keeps its share of a core under
+    `max_overhead` even when the requested rate would exceed it. One profile runs at a time
+    per process; a second caller gets `ProfilerBusyError`.
+    """
+
+    def __init__(self, max_seconds: float, max_rate: int, max_overhead: float = 0.05):
+        self.max_seconds = max_seconds
+        self.max_rate = max_rate
+        self.max_overhead = max_overhead
+        self._running = threading.Lock()
+
+    def profile(self, seconds: float, rate: int) -> dict:
+        """
+        Sample every other thread `rate` times a second for `seconds`, both capped by the profiler's limits.
+
+        :return: Dictionary with the collapsed `stacks` ({"thread;frame;...;frame": count}),
+            the number of `samples` taken and the `overhead` (share of wall time spent sampling)
+        :raises ValueError: If `seconds` is NaN or infinite
+        """
+        if not math.isfinite(seconds):
+            raise ValueError("'seconds' must be a finite number.")
+        seconds = min(max(seconds, 0.0), self.max_seconds)
+        interval = 1.0 / min(max(rate, 1), self.max_rate)
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running in this process")
+        try:
+            return self._sample(seconds, interval)
+        finally:
+            self._running.release()
+
+    def reset_after_fork(self) -> None:
+        # A profile running in the parent does not run in the child.
+        self._running = threading.Lock()
+
+    def _sample(self, seconds: float, interval: float) -> dict:
+        stacks = Counter()
+        samples = 0
+        sampling_seconds = 0.0
+        own_thread_id = threading.get_ident()
+        started_at = time.perf_counter()
+        stop_at = started_at + seconds
+        # Whatever `seconds` is (NaN never compares as past), the sampler and its lock stop here.
+        give_up_at = started_at + self.max_seconds
+
+        while True:
+            sample_started_at = time.perf_counter()
+            if sample_started_at >= stop_at or sample_started_at >= give_up_at:
+                break
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_get_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(thread_names.get(thread_id, str(thread_id)).replace(';', ',').replace(' ', '_'))
+                stacks[';'.join(reversed(labels))] += 1
+            samples += 1
+
+            spent = time.perf_counter() - sample_started_at
+            sampling_seconds += spent
+            time.sleep(max(interval - spent, spent * (1 - self.max_overhead) / self.max_overhead))
+
+        elapsed = time.perf_counter() - started_at
+        return {
+            "stacks": dict(stacks),
+            "samples": samples,
+            "overhead": sampling_seconds / elapsed if elapsed else 0.0,
+        }
+
+
+def format_collapsed_stacks(stacks: dict) -> str:
+    """Stacks as lines of `frame;frame;frame count`, the input format of flamegraph.pl and speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+sampling_profiler = SamplingProfiler(
+    max_seconds=config.PROFILER_MAX_SECONDS,
+    max_rate=config.PROFILER_MAX_SAMPLE_RATE,
+    max_overhead=config.PROFILER_MAX_OVERHEAD,
+)
+os.register_at_fork(after_in_child=sampling_profiler.reset_after_fork)
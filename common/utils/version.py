@@ -1,17 +1,23 @@
 from configparser import ConfigParser
+from functools import lru_cache
 
-cf = ConfigParser()
 
-cf.read('pyproject.toml')
+@lru_cache(maxsize=None)
+def _get_project_config():
+    # Read on first use rather than at import time.
+    cf = ConfigParser()
+    cf.read('pyproject.toml')
+    return cf
 
 
 def get_service_version():
-    return cf['tool.poetry']['version'].strip('"')
+    return _get_project_config()['tool.poetry']['version'].strip('"')
 
 
 def get_project_name():
-    return cf['tool.poetry']['name'].title()
+    return _get_project_config()['tool.poetry']['name'].title()
 
 
 def main():
+    cf = _get_project_config()
     print(f"{cf['tool.poetry']['name'].title()} running at version: {cf['tool.poetry']['version']}")
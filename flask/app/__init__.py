@@ -3,32 +3,46 @@ from flask_restx import Api
 from flask_cors import CORS
 
 
-from rococo.plugins.pooled_connection import PooledConnectionPlugin
+from psycopg2.errors import QueryCanceled
 from rococo.models.versioned_model import ModelValidationError
 
 from app.helpers.exceptions import InputValidationError, APIException
+from app.helpers.json_provider import init_json_provider
+from app.helpers.msgpack_serializer import init_msgpack
+from app.helpers.compression import init_compression
+from app.helpers.pooled_db import init_pooled_db
+from app.helpers.post_fork import init_post_fork
+from app.helpers.server_timing import init_server_timing
+from app.helpers.query_budget import init_query_budgets
+from app.helpers.deadline import init_deadlines
+from app.helpers.metrics import init_metrics
+from app.helpers.slow_query_log import init_slow_query_log
 
 from common.app_config import get_config
+from common.utils.deadline import DeadlineExceededError
+from common.utils.password_hasher import PasswordHasherBusyError
 from common.utils.version import get_service_version, get_project_name
 from logger import set_request_exception_signal, logger
 
 
 
-# Initialize Flask-Restx
-api = Api(
-    version=get_service_version(),
-    title=get_project_name(),
-    description="Welcome to the API documentation of Rococo Sample API",
-    authorizations={'Bearer': {'type': 'apiKey', 'in': 'header', 'name': 'Authorization'}},
-    security='Bearer',
-    doc='/api-doc'
-)
-
 def create_app():
     config = get_config()
 
+    # Initialize Flask-Restx
+    api = Api(
+        version=get_service_version(),
+        title=get_project_name(),
+        description="Welcome to the API documentation of Rococo Sample API",
+        authorizations={'Bearer': {'type': 'apiKey', 'in': 'header', 'name': 'Authorization'}},
+        security='Bearer',
+        doc='/api-doc'
+    )
+
     app = Flask(__name__)
     app.config.from_object(config)
+    init_json_provider(app)
+    init_msgpack(app)
 
     with app.app_context():
         set_request_exception_signal(app)
@@ -42,7 +56,15 @@ def create_app():
     # Add simple CORS support
     CORS(app)
 
-    PooledConnectionPlugin(app, database_type="postgres")
+    init_compression(app)
+    init_deadlines(app)
+    init_server_timing(app)
+    init_query_budgets(app)
+    init_metrics(app)
+    init_slow_query_log(app)
+
+    init_pooled_db(app)
+    init_post_fork(app)
 
     @app.route('/')
     def hello_world():
@@ -61,10 +83,34 @@ def create_app():
         return get_failure_response(message=str(exception))
 
 
+    @app.errorhandler(PasswordHasherBusyError)
+    def handle_password_hasher_busy_error(exception):
+        from app.helpers.response import get_failure_response
+        return get_failure_response(message='Too many sign-in requests are being processed. Please try again.', status_code=503)
+
+    @app.errorhandler(DeadlineExceededError)
+    @app.errorhandler(QueryCanceled)
+    def handle_deadline_exceeded_error(exception):
+        # QueryCanceled is Postgres enforcing the statement_timeout set from the deadline.
+        from app.helpers.response import get_failure_response
+        response = get_failure_response(message='The request took too long to process. Please try again.', status_code=503)
+        response.headers['Retry-After'] = str(config.REQUEST_DEADLINE_RETRY_AFTER)
+        return response
+
     @app.errorhandler(APIException)
     def handle_application_error(exception):
         # Handle your custom exception here
         from app.helpers.response import get_failure_response
         return get_failure_response(message=str(exception))
 
+    # flask-restx answers every exception raised in a resource itself (with a 500) unless
+    # PROPAGATE_EXCEPTIONS is set. Re-raising from its handler hands these back to the app's handlers above.
+    def defer_to_app_error_handler(exception):
+        raise exception
+
+    for exception_class in (
+        ModelValidationError, InputValidationError, PasswordHasherBusyError, DeadlineExceededError, QueryCanceled, APIException
+    ):
+        api.errorhandler(exception_class)(defer_to_app_error_handler)
+
     return app
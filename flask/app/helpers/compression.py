@@ -0,0 +1,198 @@
+import gzip
+import os
+import threading
+import time
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+
+COMPRESSIBLE_MIME_TYPES = {
+    'application/json',
+    'application/msgpack',
+    'application/x-ndjson',
+    'text/html',
+    'text/plain',
+}
+
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def compressor(self):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+        return (
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush
+        )
+
+
+class BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, quality):
+        self.quality = quality
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.quality)
+
+    def compressor(self):
+        compressor = brotli.Compressor(quality=self.quality)
+        return (
+            lambda chunk: compressor.process(chunk) + compressor.flush(),
+            compressor.finish
+        )
+
+
+class ZstdEncoder:
+    name = 'zstd'
+
+    def __init__(self, level):
+        self.compressor_factory = zstandard.ZstdCompressor(level=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor_factory.compress(data)
+
+    def compressor(self):
+        compressor = self.compressor_factory.compressobj()
+        return (
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush
+        )
+
+
+class CompressionStats:
+    """Per-route totals of bytes before and after compression and of CPU time spent compressing."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route: str, encoding: str, original_size: int, compressed_size: int, cpu_seconds: float):
+        with self._lock:
+            stats = self._routes.setdefault((route, encoding), [0, 0, 0, 0.0])
+            stats[0] += 1
+            stats[1] += original_size
+            stats[2] += compressed_size
+            stats[3] += cpu_seconds
+
+    def reset_after_fork(self):
+        # Forked workers report their own numbers, starting from zero.
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def get_metrics(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    'route': route,
+                    'encoding': encoding,
+                    'responses': responses,
+                    'original_bytes': original_size,
+                    'compressed_bytes': compressed_size,
+                    'bytes_saved': original_size - compressed_size,
+                    'cpu_seconds': cpu_seconds,
+                }
+                for (route, encoding), (responses, original_size, compressed_size, cpu_seconds) in self._routes.items()
+            ]
+
+
+compression_stats = CompressionStats()
+os.register_at_fork(after_in_child=compression_stats.reset_after_fork)
+
+
+def _get_encoders(app) -> dict:
+    # Server preference order, used to break ties between equally weighted client encodings.
+    encoders = {}
+    if zstandard is not None:
+        encoders['zstd'] = ZstdEncoder(app.config['COMPRESSION_ZSTD_LEVEL'])
+    if brotli is not None:
+        encoders['br'] = BrotliEncoder(app.config['COMPRESSION_BROTLI_QUALITY'])
+    encoders['gzip'] = GzipEncoder(app.config['COMPRESSION_GZIP_LEVEL'])
+    return encoders
+
+
+def _stream(encoder, chunks, route):
+    compress_chunk, finish = encoder.compressor()
+    original_size = compressed_size = 0
+    cpu_seconds = 0.0
+    try:
+        for chunk in chunks:
+            start = time.thread_time()
+            compressed = compress_chunk(chunk)
+            cpu_seconds += time.thread_time() - start
+            original_size += len(chunk)
+            compressed_size += len(compressed)
+            if compressed:
+                yield compressed
+        start = time.thread_time()
+        compressed = finish()
+        cpu_seconds += time.thread_time() - start
+        compressed_size += len(compressed)
+        yield compressed
+    finally:
+        compression_stats.record(route, encoder.name, original_size, compressed_size, cpu_seconds)
+
+
+def init_compression(app):
+    """
+    Compress responses with the best encoding the client accepts (zstd, br or gzip).
+
+    Buffered responses smaller than `COMPRESSION_MIN_SIZE` bytes are sent as is;
+    streamed responses are always compressed, chunk by chunk, as they are produced.
+    """
+    if not app.config.get('COMPRESSION_ENABLED'):
+        return
+
+    encoders = _get_encoders(app)
+    min_size = app.config['COMPRESSION_MIN_SIZE']
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code < 200 or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIME_TYPES
+        ):
+            return response
+
+        encoding = request.accept_encodings.best_match(list(encoders))
+        if encoding is None:
+            return response
+        encoder = encoders[encoding]
+        # Unmatched paths share one label so 404 scans cannot grow the stats without bound.
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+
+        if response.is_streamed:
+            response.response = _stream(encoder, response.iter_encoded(), route)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                response.vary.add('Accept-Encoding')
+                return response
+            start = time.thread_time()
+            compressed = encoder.compress(data)
+            compression_stats.record(route, encoding, len(data), len(compressed), time.thread_time() - start)
+            response.set_data(compressed)
+
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,20 @@
+from flask import request
+
+from common.utils.deadline import set_deadline
+
+
+def init_deadlines(app):
+    """
+    Start every request with a time budget: `REQUEST_DEADLINES[endpoint]` if set, else `REQUEST_DEADLINE`.
+
+    Database access checks the budget before taking a pooled connection and passes what is
+    left to Postgres as the statement timeout; running out raises `DeadlineExceededError`.
+    """
+    default_deadline = app.config['REQUEST_DEADLINE']
+    deadlines = app.config['REQUEST_DEADLINES']
+
+    @app.before_request
+    def start_deadline():
+        seconds = deadlines.get(request.endpoint, default_deadline)
+        if seconds:
+            set_deadline(seconds)
@@ -1,11 +1,14 @@
+import hmac
 from functools import wraps
 from flask import request
 from flask import g, abort
 
 from app.helpers.response import get_failure_response
+from app.helpers.revocation_list import revocation_list
 from inspect import signature
 from common.app_logger import logger
 from common.app_config import config
+from common.utils.request_timing import timed
 
 from common.models.person_organization_role import PersonOrganizationRoleEnum
 from common.services.email import EmailService
@@ -15,37 +18,77 @@ from common.services import OrganizationService, PersonOrganizationRoleService
 
 
 
-def login_required():
+class LazyModel:
+    """
+    Stands in for a model known only by its `entity_id`.
+
+    The model is loaded with `loader(entity_id)` the first time any other attribute is read,
+    so handlers that only need the ID never query it.
+    """
+
+    def __init__(self, entity_id, loader):
+        self.entity_id = entity_id
+        self._loader = loader
+        self._instance = None
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if self._instance is None:
+            self._instance = self._loader(self.entity_id)
+            if self._instance is None:
+                raise AttributeError(f"{name} (entity {self.entity_id} does not exist)")
+        return getattr(self._instance, name)
+
+
+def login_required(stateless=False):
+    """
+    Authenticate the request with its bearer access token.
+
+    Tokens are checked against the in-memory revocation list. By default the person and
+    email of the token are then loaded from the database. With `stateless`, the signed
+    claims are trusted instead: `person`/`email` are lazy stand-ins that query the database
+    only if the handler reads more than their `entity_id`.
+    """
     def decorator(func):
         @wraps(func)
         def wrapper(self, *args, **kwargs):
             if 'Authorization' not in request.headers:
                 return get_failure_response(message="Authorization header not present", status_code=401)
             
-            auth_service = AuthService(config)
-            email_service = EmailService(config)
-            person_service = PersonService(config)
+            with timed('auth'):
+                auth_service = AuthService(config)
+                email_service = EmailService(config)
+                person_service = PersonService(config)
 
-            data = request.headers['Authorization']
-            token = str.replace(str(data), 'Bearer ', '')
-            try:
-                parsed_token = auth_service.parse_access_token(token)
+                data = request.headers['Authorization']
+                token = str.replace(str(data), 'Bearer ', '')
+                try:
+                    parsed_token = auth_service.parse_access_token(token)
 
-                if not parsed_token:
-                    return get_failure_response(message='Access token is invalid', status_code=401)
+                    if not parsed_token:
+                        return get_failure_response(message='Access token is invalid', status_code=401)
 
-                person_id = parsed_token.get('person_id')
-                email_id = parsed_token.get('email_id')
+                    person_id = parsed_token.get('person_id')
+                    email_id = parsed_token.get('email_id')
 
-                email = email_service.get_email_by_id(email_id)
-                person = person_service.get_person_by_id(person_id)
+                    # Tokens issued before `iat` was added cannot be checked against the revocation list.
+                    if 'iat' in parsed_token and revocation_list.is_revoked(person_id, parsed_token['iat']):
+                        return get_failure_response(message='Access token is invalid', status_code=401)
 
-                g.person = person
-                g.email = email
+                    if stateless and 'iat' in parsed_token:
+                        email = LazyModel(email_id, email_service.get_email_by_id)
+                        person = LazyModel(person_id, person_service.get_person_by_id)
+                    else:
+                        email = email_service.get_email_by_id(email_id)
+                        person = person_service.get_person_by_id(person_id)
 
-            except Exception as e:
-                logger.exception(e)
-                abort(500)
+                    g.person = person
+                    g.email = email
+
+                except Exception as e:
+                    logger.exception(e)
+                    abort(500)
 
             # handle arguments based on the function parameters
             func_params = signature(func).parameters
@@ -64,6 +107,24 @@ def login_required():
     return decorator
 
 
+def admin_required(func):
+    """
+    Allow the request only with the `ADMIN_API_TOKEN` in its `X-Admin-Token` header.
+
+    Without a configured token admin endpoints answer 404, as if they did not exist.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not config.ADMIN_API_TOKEN:
+            return get_failure_response(message="Not found", status_code=404)
+        token = request.headers.get('X-Admin-Token', '')
+        if not hmac.compare_digest(token.encode(), config.ADMIN_API_TOKEN.encode()):
+            return get_failure_response(message="Admin token is invalid", status_code=401)
+        return func(self, *args, **kwargs)
+
+    return wrapper
+
+
 def organization_required(with_roles=None):
     def decorator(func):
         @wraps(func)
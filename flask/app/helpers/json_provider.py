@@ -0,0 +1,65 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+from werkzeug.http import http_date
+
+from logger import logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+
+def _default(o):
+    # Mirrors flask.json.provider._default for the types orjson does not handle natively.
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider backed by orjson.
+
+    Dataclasses (including rococo models), UUIDs and enums are serialized natively, so
+    views can return models without building intermediate dicts with `as_dict()`.
+    Datetimes keep Flask's HTTP date format unless `JSON_DATETIME_FORMAT` is "iso", in
+    which case orjson writes them natively as ISO 8601.
+    """
+
+    mimetype = "application/json"
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.option = orjson.OPT_NON_STR_KEYS
+        if app.config.get("JSON_DATETIME_FORMAT") != "iso":
+            self.option |= orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps_bytes(self, obj, **kwargs) -> bytes:
+        return orjson.dumps(obj, default=_default, option=self.option)
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def init_json_provider(app):
+    """Install the JSON provider selected by the `JSON_PROVIDER` config ("orjson" or "default")."""
+    if app.config.get("JSON_PROVIDER") == "orjson":
+        if orjson is not None:
+            app.json = OrjsonProvider(app)
+            return
+        logger.warning("orjson is not installed, falling back to the default JSON provider")
+    app.json = DefaultJSONProvider(app)
@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from flask import g, request
+from prometheus_client import REGISTRY, CollectorRegistry, make_wsgi_app, multiprocess
+
+from app.helpers.compression import compression_stats
+from app.helpers.revocation_list import revocation_list
+from app.helpers.todo_changes import todo_change_listener
+from common.repositories.base import get_current_operation
+from common.tasks.send_message import broker_circuit_breaker
+from common.utils.circuit_breaker import CircuitBreakerState
+from common.utils.instrumented_db import add_query_listener
+from common.utils.metrics import (
+    BROKER_CIRCUIT_STATE, BROKER_CIRCUIT_TRIPS, COMPRESSION_COMPRESSED_BYTES, COMPRESSION_CPU_SECONDS,
+    COMPRESSION_ORIGINAL_BYTES, COMPRESSION_RESPONSES, DB_POOL_CONNECTIONS, DB_POOL_MAX_CONNECTIONS, DB_QUERY_DURATION,
+    PASSWORD_HASH_JOBS, PASSWORD_HASH_SECONDS, REQUEST_DURATION, REVOCATION_LIST_ENTRIES, TODO_CHANGE_SUBSCRIBERS
+)
+from common.utils.password_hasher import password_hasher
+
+# Process gauges are refreshed after requests at most this often (seconds), and on every scrape.
+PROCESS_METRICS_REFRESH_INTERVAL = 1.0
+
+BROKER_CIRCUIT_STATE_VALUES = {
+    CircuitBreakerState.CLOSED.value: 0,
+    CircuitBreakerState.HALF_OPEN.value: 1,
+    CircuitBreakerState.OPEN.value: 2,
+}
+
+_last_refreshed_at = 0.0
+
+
+def _record_query(query, vars, seconds):
+    repository, method = get_current_operation() or ('none', 'none')
+    DB_QUERY_DURATION.labels(repository, method).observe(seconds)
+
+
+def refresh_process_metrics(app) -> None:
+    """Copy this process's pool, broker circuit, password hasher, compression and stream state into their gauges."""
+    global _last_refreshed_at
+    _last_refreshed_at = time.monotonic()
+
+    pooled_db = app.extensions.get('pooled_db')
+    pool = pooled_db.pool if pooled_db is not None else None
+    if pool is not None:
+        # Read without the pool's lock; a gauge can be a moment stale.
+        DB_POOL_CONNECTIONS.labels('in_use').set(pool._connections)
+        DB_POOL_CONNECTIONS.labels('idle').set(len(pool._idle_cache))
+        DB_POOL_MAX_CONNECTIONS.set(pool._maxconnections)
+
+    circuit = broker_circuit_breaker.get_metrics()
+    BROKER_CIRCUIT_STATE.set(BROKER_CIRCUIT_STATE_VALUES[circuit['state']])
+    BROKER_CIRCUIT_TRIPS.set(circuit['trip_count'])
+
+    hasher = password_hasher.get_metrics()
+    PASSWORD_HASH_JOBS.labels('completed').set(hasher['job_count'])
+    PASSWORD_HASH_JOBS.labels('rejected').set(hasher['rejected_count'])
+    PASSWORD_HASH_SECONDS.labels('queue').set(hasher['queue_seconds'])
+    PASSWORD_HASH_SECONDS.labels('run').set(hasher['run_seconds'])
+
+    for route in compression_stats.get_metrics():
+        labels = (route['route'], route['encoding'])
+        COMPRESSION_RESPONSES.labels(*labels).set(route['responses'])
+        COMPRESSION_ORIGINAL_BYTES.labels(*labels).set(route['original_bytes'])
+        COMPRESSION_COMPRESSED_BYTES.labels(*labels).set(route['compressed_bytes'])
+        COMPRESSION_CPU_SECONDS.labels(*labels).set(route['cpu_seconds'])
+
+    TODO_CHANGE_SUBSCRIBERS.set(todo_change_listener.get_subscriber_count())
+    REVOCATION_LIST_ENTRIES.set(revocation_list.get_entry_count())
+
+
+def _get_registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    # Every worker writes its own files; collect all of them, not only this process's values.
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(app, port: int) -> WSGIServer:
+    """
+    Serve `/metrics` on `port` from a daemon thread of this process.
+
+    Under gunicorn this runs in the master (the app is preloaded there), which collects the
+    files every worker writes; workers refresh their process gauges after their requests.
+    A single-process server refreshes them on every scrape too.
+    """
+    metrics_app = make_wsgi_app(_get_registry())
+
+    def serve_metrics(environ, start_response):
+        if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+            refresh_process_metrics(app)
+        return metrics_app(environ, start_response)
+
+    server = make_server('0.0.0.0', port, serve_metrics, handler_class=_QuietRequestHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
+
+
+def init_metrics(app):
+    """
+    Collect Prometheus metrics when `METRICS_ENABLED` is set, served on `METRICS_PORT` if one is set.
+
+    Metrics name repositories, routes, pool sizes and broker state, so they are not served on
+    the public API port. Requests are timed per route template (`/todo/<string:todo_id>`,
+    not the path), method and status. Statements run on the request pool are timed per repository and method, see
+    `common.repositories.base.get_current_operation`; those run outside a repository call are
+    labelled `none`.
+    """
+    if not app.config.get('METRICS_ENABLED'):
+        return
+
+    add_query_listener(_record_query)
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started_at = time.perf_counter()
+
+    @app.after_request
+    def record_request_duration(response):
+        started_at = g.get('metrics_started_at')
+        if started_at is not None:
+            # Unmatched paths share one label so 404 scans cannot create a series each.
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            REQUEST_DURATION.labels(route, request.method, response.status_code).observe(
+                time.perf_counter() - started_at
+            )
+        if time.monotonic() - _last_refreshed_at >= PROCESS_METRICS_REFRESH_INTERVAL:
+            refresh_process_metrics(app)
+        return response
+
+    if app.config.get('METRICS_PORT'):
+        start_metrics_server(app, app.config['METRICS_PORT'])
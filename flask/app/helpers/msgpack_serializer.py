@@ -0,0 +1,56 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date
+
+from werkzeug.http import http_date
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack responses are optional
+    msgpack = None
+
+
+class MsgpackSerializer:
+    """
+    MessagePack encoding of response and request payloads.
+
+    Payloads are encoded the same way the JSON provider encodes them: models become maps
+    of their fields, and datetimes keep the HTTP date format unless `JSON_DATETIME_FORMAT`
+    is "iso".
+    """
+
+    def __init__(self, app):
+        self.iso_datetimes = app.config.get("JSON_DATETIME_FORMAT") == "iso"
+        self._field_names = {}
+
+    def _default(self, o):
+        if isinstance(o, date):
+            return o.isoformat() if self.iso_datetimes else http_date(o)
+        if isinstance(o, (decimal.Decimal, uuid.UUID)):
+            return str(o)
+        if dataclasses.is_dataclass(o):
+            # Shallow on purpose: nested values come back through this hook as they are packed.
+            field_names = self._field_names.get(type(o))
+            if field_names is None:
+                field_names = self._field_names[type(o)] = [field.name for field in dataclasses.fields(o)]
+            if hasattr(type(o), "__slots__"):
+                return {name: getattr(o, name) for name in field_names}
+            # Read the instance dict directly, as orjson does; rococo models make every
+            # attribute access through __getattribute__ expensive.
+            values = object.__getattribute__(o, "__dict__")
+            return {name: values[name] for name in field_names}
+        if hasattr(o, "__html__"):
+            return str(o.__html__())
+        raise TypeError(f"Object of type {type(o).__name__} is not MessagePack serializable")
+
+    def dumps(self, obj) -> bytes:
+        return msgpack.packb(obj, default=self._default)
+
+    def loads(self, data: bytes):
+        return msgpack.unpackb(data, raw=False)
+
+
+def init_msgpack(app):
+    """Enable MessagePack negotiation on the app when msgpack is installed."""
+    app.extensions["msgpack"] = MsgpackSerializer(app) if msgpack is not None else None
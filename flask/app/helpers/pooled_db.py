@@ -0,0 +1,42 @@
+import psycopg2
+from flask import g
+from dbutils.pooled_db import PooledDB
+from rococo.plugins.pooled_connection import PooledConnectionPlugin
+
+from common.app_logger import logger
+from common.utils.deadline import reset_statement_timeout
+from common.utils.instrumented_db import InstrumentedConnection
+
+
+def create_pool(app) -> PooledDB:
+    return PooledDB(
+        creator=psycopg2,
+        maxconnections=app.config.get('POSTGRES_POOL_MAX_CONNECTIONS'),
+        host=app.config.get('POSTGRES_HOST'),
+        port=app.config.get('POSTGRES_PORT'),
+        user=app.config.get('POSTGRES_USER'),
+        password=app.config.get('POSTGRES_PASSWORD'),
+        database=app.config.get('POSTGRES_DB'),
+        connection_factory=InstrumentedConnection
+    )
+
+
+def init_pooled_db(app):
+    """
+    Serve requests from rococo's pooled connections, opened as `InstrumentedConnection`s so
+    their statements reach the query listeners.
+    """
+    plugin = PooledConnectionPlugin(app, database_type="postgres")
+    # The plugin's own pool has not opened a connection yet; swap it before anything does.
+    plugin.pool = create_pool(app)
+
+    # Registered after the plugin's teardown, so it runs first, while the request still holds the connection.
+    @app.teardown_appcontext
+    def reset_connection_statement_timeout(exception):
+        connection = g.get('db_conn')
+        if connection is None:
+            return
+        try:
+            reset_statement_timeout(connection)
+        except psycopg2.Error:
+            logger.exception("Could not reset the statement timeout of a pooled connection")
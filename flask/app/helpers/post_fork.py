@@ -0,0 +1,25 @@
+import os
+
+from app.helpers.pooled_db import create_pool
+
+# Pools inherited from the parent process. Their connections share sockets with the parent,
+# so they are never closed here (closing would terminate the parent's sessions), only kept alive.
+_inherited_pools = []
+
+
+def _reinitialize_pooled_db(app):
+    pooled_db = app.extensions.get('pooled_db')
+    if pooled_db is None or pooled_db.pool is None:
+        return
+    _inherited_pools.append(pooled_db.pool)
+    pooled_db.pool = create_pool(app)
+
+
+def init_post_fork(app):
+    """
+    Give every process forked from this one (e.g. preforked server workers) its own database pool.
+
+    Module-level resources (locks, caches, broker and listener connections) reset themselves
+    through their own `os.register_at_fork` hooks.
+    """
+    os.register_at_fork(after_in_child=lambda: _reinitialize_pooled_db(app))
@@ -0,0 +1,142 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, g, has_request_context, request
+
+from common.utils.deadline import RESET_STATEMENT_TIMEOUT_QUERY, STATEMENT_TIMEOUT_QUERY
+from common.utils.instrumented_db import COMMIT, ROLLBACK, add_query_listener, remove_query_listener
+
+# Quoted strings and numbers, then runs of placeholders as written by get_bulk_save_queries and get_many.
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*")
+_WHITESPACE = re.compile(r"\s+")
+
+# Set while statements that do not belong to the request itself run on its thread.
+_unbudgeted = ContextVar('unbudgeted', default=False)
+
+
+class QueryBudgetExceededError(Exception):
+    pass
+
+
+def query_budget(max_queries: int):
+    """
+    Declare the most SQL statements one request to the decorated view may run.
+
+    Commits, rollbacks and the statement timeouts set for request deadlines are round trips,
+    not statements, and do not count against the budget.
+    """
+    def decorator(func):
+        func.query_budget = max_queries
+        return func
+
+    return decorator
+
+
+@contextmanager
+def unbudgeted():
+    """
+    Leave the statements run inside out of the current request's query budget.
+
+    For bookkeeping that only some requests happen to trigger, such as the periodic reload
+    of the revocation list, so a view's budget does not depend on when it is called.
+    """
+    token = _unbudgeted.set(True)
+    try:
+        yield
+    finally:
+        _unbudgeted.reset(token)
+
+
+def get_query_shape(query) -> str:
+    """`query` with its literals and parameter lists collapsed, so repeats of one statement compare equal."""
+    if isinstance(query, bytes):
+        query = query.decode(errors="replace")
+    shape = _LITERALS.sub("?", str(query))
+    shape = _PLACEHOLDER_LISTS.sub("(...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryRecorder:
+    """
+    Records the statements run while it is active, on this thread or any other.
+
+    Works with any connection that reports to the query listeners: the request pool's
+    `InstrumentedConnection`s against a real Postgres, or an in-memory stand-in that calls
+    `notify_query_listeners` for the statements it fakes.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.round_trips = 0
+
+    def __enter__(self):
+        add_query_listener(self.record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        remove_query_listener(self.record)
+
+    def record(self, query, vars, seconds):
+        self.round_trips += 1
+        if query not in (COMMIT, ROLLBACK, STATEMENT_TIMEOUT_QUERY, RESET_STATEMENT_TIMEOUT_QUERY):
+            self.queries.append(query)
+
+    def get_repeated_shapes(self) -> list[tuple[str, int]]:
+        """Statement shapes run more than once, most frequent first: the usual sign of an N+1."""
+        counts = Counter(get_query_shape(query) for query in self.queries)
+        return [(shape, count) for shape, count in counts.most_common() if count > 1]
+
+    def get_report(self, title: str) -> str:
+        lines = [f"{title}: {len(self.queries)} statements in {self.round_trips} round trips"]
+        counts = Counter(get_query_shape(query) for query in self.queries)
+        for shape, count in counts.most_common():
+            lines.append(f"  {count}x {'(repeated) ' if count > 1 else ''}{shape}")
+        return "\n".join(lines)
+
+
+def _get_view_function():
+    view_function = current_app.view_functions.get(request.endpoint)
+    # flask-restx resources dispatch to the method named after the HTTP verb.
+    view_class = getattr(view_function, "view_class", None)
+    if view_class is not None:
+        return getattr(view_class, request.method.lower(), None)
+    return view_function
+
+
+def init_query_budgets(app):
+    """
+    Check every request against the `query_budget` of its view, when `QUERY_BUDGETS_ENFORCED` is set.
+
+    A request that runs more statements than its view allows raises `QueryBudgetExceededError`
+    with a report of what it ran, so a test client request fails loudly. Meant for tests
+    and local runs; views without a budget are not checked, and statements run while a
+    streamed body is sent or under `unbudgeted` are not counted.
+    """
+    if not app.config.get("QUERY_BUDGETS_ENFORCED"):
+        return
+
+    def record(query, vars, seconds):
+        if _unbudgeted.get():
+            return
+        # Listeners are process-wide; only count this app's requests (tests build several apps).
+        if has_request_context() and current_app._get_current_object() is app and "query_recorder" in g:
+            g.query_recorder.record(query, vars, seconds)
+
+    add_query_listener(record)
+
+    @app.before_request
+    def start_recording():
+        g.query_recorder = QueryRecorder()
+
+    @app.after_request
+    def check_query_budget(response):
+        recorder = g.pop("query_recorder", None)
+        budget = getattr(_get_view_function(), "query_budget", None)
+        if recorder is not None and budget is not None and len(recorder.queries) > budget:
+            raise QueryBudgetExceededError(
+                recorder.get_report(f"{request.method} {request.path} exceeded its budget of {budget} statements")
+            )
+        return response
@@ -1,10 +1,16 @@
-from flask import current_app as app
+import dataclasses
+
+from flask import current_app as app, has_request_context, request as current_request, stream_with_context
 from app.helpers.exceptions import InputValidationError
+from common.utils.request_timing import timed
 
 
 def parse_request_body(request, keys, default_value=None):
     try:
-        request_body = request.get_json(force=True)
+        if request.mimetype == app.config['MSGPACK_MIME_TYPE'] and app.extensions.get('msgpack'):
+            request_body = app.extensions['msgpack'].loads(request.get_data())
+        else:
+            request_body = request.get_json(force=True)
         return {key: request_body.get(key, default_value) for key in keys}
     except Exception as e:
         raise InputValidationError(f"Error parsing request body: {str(e)}")
@@ -16,12 +22,80 @@ def validate_required_fields(required_fields):
             raise InputValidationError(f"'{field}' is required and cannot be empty.")
 
 
+def parse_list_shape(request, model):
+    """
+    Read the `fields` and `shape` query parameters of a list endpoint.
+
+    `fields` is a comma separated list of `model` attributes to return. `shape` is either
+    "rows" (a list of objects, the default) or "columns" (one list of values per field).
+
+    :return: Requested field names, or None for every field of a row response, and whether the shape is columnar
+    """
+    model_fields = [field.name for field in dataclasses.fields(model)]
+    fields = request.args.get("fields")
+    if fields:
+        fields = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+        unknown_fields = [field for field in fields if field not in model_fields]
+        if unknown_fields:
+            raise InputValidationError(f"Unknown fields: {', '.join(unknown_fields)}")
+    else:
+        fields = None
+
+    shape = request.args.get("shape", "rows")
+    if shape not in ("rows", "columns"):
+        raise InputValidationError("'shape' must be either 'rows' or 'columns'.")
+    columnar = shape == "columns"
+    if columnar and fields is None:
+        fields = model_fields
+    return fields, columnar
+
+
+def shape_list(items, fields=None, columnar=False):
+    """
+    Keep only `fields` of every item, reading just those attributes.
+
+    Returns the items unchanged without `fields`, a list of dicts for a row shape and
+    a dict of `{field: [values]}` for a columnar shape.
+    """
+    if fields is None:
+        return items
+    if columnar:
+        return {field: [getattr(item, field) for item in items] for field in fields}
+    return [{field: getattr(item, field) for field in fields} for item in items]
+
+
+def _dumps_bytes(data):
+    # Providers that can produce bytes directly skip a decode/encode round trip.
+    if hasattr(app.json, 'dumps_bytes'):
+        return app.json.dumps_bytes(data)
+    return app.json.dumps(data).encode()
+
+
+def _get_msgpack_serializer():
+    # The MessagePack serializer when the client prefers it to JSON, otherwise None.
+    serializer = app.extensions.get('msgpack')
+    if serializer is None or not has_request_context():
+        return None
+    mime_types = [app.config['MIME_TYPE'], app.config['MSGPACK_MIME_TYPE']]
+    if current_request.accept_mimetypes.best_match(mime_types) != app.config['MSGPACK_MIME_TYPE']:
+        return None
+    return serializer
+
+
 def _get_response(data, status_code=200):
+    with timed('serialize'):
+        msgpack_serializer = _get_msgpack_serializer()
+        if msgpack_serializer is not None:
+            body, mimetype = msgpack_serializer.dumps(data), app.config['MSGPACK_MIME_TYPE']
+        else:
+            body, mimetype = _dumps_bytes(data), app.config['MIME_TYPE']
     response = app.response_class(
-        response=app.json.dumps(data),
+        response=body,
         status=status_code,
-        mimetype=app.config['MIME_TYPE']
+        mimetype=mimetype
     )
+    if app.extensions.get('msgpack'):
+        response.vary.add('Accept')
     return response
 
 
@@ -33,3 +107,37 @@ def get_failure_response(message, status_code=200):
 def get_success_response(status_code=200, **data):
     response = _get_response(dict(success=True, **data), status_code)
     return response
+
+
+def get_streaming_success_response(key, batches, ndjson=False, status_code=200):
+    """
+    Stream a list as it is produced, one batch at a time.
+
+    By default the body is the same document `get_success_response(**{key: [...]})` would
+    return, written in chunks. With `ndjson` every item is written as its own JSON line.
+    Streamed lists are always JSON, even for clients that accept MessagePack.
+
+    :param key: Name of the list in the response document
+    :param batches: Iterable of lists of items to serialize
+    :param ndjson: Stream newline-delimited JSON instead of a single document
+    """
+    def generate_json():
+        yield b'{"success":true,' + _dumps_bytes(key) + b':['
+        separator = b''
+        for batch in batches:
+            if batch:
+                # Serialize the whole batch at once and drop its surrounding brackets.
+                yield separator + _dumps_bytes(batch)[1:-1]
+                separator = b','
+        yield b']}'
+
+    def generate_ndjson():
+        for batch in batches:
+            yield b''.join(_dumps_bytes(item) + b'\n' for item in batch)
+
+    response = app.response_class(
+        response=stream_with_context(generate_ndjson() if ndjson else generate_json()),
+        status=status_code,
+        mimetype=app.config['NDJSON_MIME_TYPE'] if ndjson else app.config['MIME_TYPE']
+    )
+    return response
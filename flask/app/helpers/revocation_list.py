@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+
+from app.helpers.query_budget import unbudgeted
+from common.app_config import config
+from common.app_logger import logger
+from common.services.access_token_revocation import AccessTokenRevocationService
+
+
+class RevocationList:
+    """
+    In-memory copy of the access token revocations, reloaded from Postgres every `refresh_interval` seconds.
+
+    Only revocations newer than the access token lifetime are kept, so the list stays small.
+    A revocation takes up to `refresh_interval` seconds to reach every worker. If a reload
+    fails the previous list is kept and the reload is retried on the next check.
+    """
+
+    def __init__(self, config, refresh_interval: float):
+        self.config = config
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._revoked_before = {}
+        self._loaded_at = None
+
+    def is_revoked(self, person_id: str, issued_at: float) -> bool:
+        """Whether a token issued to `person_id` at `issued_at` (epoch seconds) has been revoked."""
+        self._refresh_if_stale()
+        revoked_before = self._revoked_before.get(person_id)
+        return revoked_before is not None and issued_at < revoked_before
+
+    def get_entry_count(self) -> int:
+        return len(self._revoked_before)
+
+    def reset_after_fork(self):
+        # The inherited lock may have been held by a parent thread that does not exist here.
+        self._lock = threading.Lock()
+
+    def _refresh_if_stale(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        # Only one thread reloads; the others keep using the current list meanwhile.
+        if not self._lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+                return
+            # Runs on whichever request finds the list stale; not part of that view's own queries.
+            with unbudgeted():
+                self._revoked_before = AccessTokenRevocationService(self.config).get_active_revocations()
+            self._loaded_at = time.monotonic()
+        except Exception:
+            if self._loaded_at is None:
+                raise
+            logger.exception("Failed to reload the access token revocation list")
+        finally:
+            self._lock.release()
+
+
+revocation_list = RevocationList(config, refresh_interval=config.AUTH_REVOCATION_REFRESH_INTERVAL)
+os.register_at_fork(after_in_child=revocation_list.reset_after_fork)
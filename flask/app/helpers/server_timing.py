@@ -0,0 +1,53 @@
+import time
+
+from flask import g, request
+
+from common.app_logger import logger
+from common.utils.instrumented_db import add_query_listener
+from common.utils.request_timing import get_request_timings, record_timing
+
+
+def _record_query(query, vars, seconds):
+    record_timing('db', seconds)
+
+
+def init_server_timing(app):
+    """
+    Report where each request spent its time, when `SERVER_TIMING_ENABLED` is set.
+
+    Time spent in database statements (`db`), authentication (`auth`), response
+    serialization (`serialize`) and message publishing (`publish`) is summed per request,
+    returned in a `Server-Timing` header and logged as one line. The phases can overlap:
+    `auth` includes the queries it runs. Streamed bodies are timed up to their first byte.
+    """
+    if not app.config.get('SERVER_TIMING_ENABLED'):
+        return
+
+    add_query_listener(_record_query)
+
+    @app.before_request
+    def start_timing():
+        g.request_started_at = time.perf_counter()
+
+    @app.after_request
+    def add_server_timing(response):
+        started_at = g.get('request_started_at')
+        if started_at is None:
+            return response
+        total = time.perf_counter() - started_at
+
+        metrics = []
+        fields = [
+            f"method={request.method}",
+            f"route={request.url_rule.rule if request.url_rule else request.path}",
+            f"status={response.status_code}",
+        ]
+        for name, (seconds, count) in get_request_timings().items():
+            metrics.append(f'{name};dur={seconds * 1000:.2f};desc="{count}x"')
+            fields.append(f"{name}_ms={seconds * 1000:.2f} {name}_count={count}")
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        fields.append(f"total_ms={total * 1000:.2f}")
+
+        response.headers['Server-Timing'] = ', '.join(metrics)
+        logger.info(f"Request timing: {' '.join(fields)}")
+        return response
@@ -0,0 +1,171 @@
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import psycopg2
+
+from app.helpers.query_budget import get_query_shape
+from common.app_config import config
+from common.app_logger import logger
+from common.repositories.base import get_current_operation
+from common.utils.deadline import RESET_STATEMENT_TIMEOUT_QUERY, STATEMENT_TIMEOUT_QUERY
+from common.utils.instrumented_db import COMMIT, ROLLBACK, add_query_listener
+
+# Statements EXPLAIN ANALYZE can run again without side effects; everything else is only planned.
+_READ_ONLY_STATEMENT = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_SIDE_EFFECTS = re.compile(r"\bFOR\s+(UPDATE|NO\s+KEY\s+UPDATE|SHARE|KEY\s+SHARE)\b|\bpg_notify\b|\bnextval\b", re.IGNORECASE)
+# Bounds an EXPLAIN ANALYZE of a statement that was slow enough to hit the request deadline.
+EXPLAIN_STATEMENT_TIMEOUT_MS = 30000
+
+
+def redact_parameters(vars):
+    """Query parameters with their values replaced by types, so they can be logged safely."""
+    if vars is None:
+        return None
+    if isinstance(vars, dict):
+        return {name: _redact(value) for name, value in vars.items()}
+    if _is_executemany(vars):
+        # The shape of the rows is what matters.
+        return f"<{len(vars)} rows>"
+    return [_redact(value) for value in vars]
+
+
+def _is_executemany(vars) -> bool:
+    # execute takes a tuple or dict of parameters; executemany a list of them.
+    return isinstance(vars, list) and bool(vars) and isinstance(vars[0], (list, tuple, dict))
+
+
+def _redact(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def get_service_caller():
+    """`Class.method` of the innermost service method on this thread's stack, or None."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_globals.get('__name__', '').startswith('common.services.'):
+            return frame.f_code.co_qualname
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    """
+    Logs statements slower than `threshold` seconds, and writes query plans for them to `explain_file`.
+
+    The plans of the first `explain_limit` slow occurrences of each statement shape are
+    captured by a background thread over its own read-only connection, so a request never
+    waits for one. SELECTs are explained with `EXPLAIN (ANALYZE, BUFFERS)`, which runs them
+    again; statements with side effects are only planned with `EXPLAIN`. The plan is taken
+    a moment after the slow run and may differ from it (warmer cache, other rows).
+    """
+
+    def __init__(self, config, threshold: float, explain_limit: int = 0, explain_file: str = None):
+        self.config = config
+        self.threshold = threshold
+        self.explain_limit = explain_limit if explain_file else 0
+        self.explain_file = explain_file
+
+        self._lock = threading.Lock()
+        self._explain_counts = {}
+        self._executor = None
+        self._connection = None
+        # Resources inherited from a parent process; kept referenced so they are never closed from here.
+        self._inherited = []
+
+    def record(self, query, vars, seconds):
+        if seconds < self.threshold or query in (STATEMENT_TIMEOUT_QUERY, RESET_STATEMENT_TIMEOUT_QUERY):
+            return
+        if isinstance(query, bytes):
+            query = query.decode(errors='replace')
+        shape = get_query_shape(query)
+        operation = get_current_operation()
+        logger.warning(
+            f"Slow query: {seconds * 1000:.1f} ms caller={get_service_caller()} "
+            f"repository={'.'.join(operation) if operation else None} sql={shape} params={redact_parameters(vars)}"
+        )
+        # Commits have no plan, and an executemany no single statement to explain.
+        if query in (COMMIT, ROLLBACK) or _is_executemany(vars):
+            return
+        if self.explain_limit and self._claim_explain(shape):
+            self._get_executor().submit(self._explain, shape, query, vars, seconds)
+
+    def reset_after_fork(self):
+        self._inherited.append((self._executor, self._connection))
+        self._executor = None
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _claim_explain(self, shape) -> bool:
+        with self._lock:
+            count = self._explain_counts.get(shape, 0)
+            if count >= self.explain_limit:
+                return False
+            self._explain_counts[shape] = count + 1
+            return True
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slow-query-explain')
+            return self._executor
+
+    def _get_connection(self):
+        if self._connection is None or self._connection.closed:
+            self._connection = psycopg2.connect(
+                host=self.config.POSTGRES_HOST,
+                port=self.config.POSTGRES_PORT,
+                user=self.config.POSTGRES_USER,
+                password=self.config.POSTGRES_PASSWORD,
+                dbname=self.config.POSTGRES_DB,
+                options=f"-c default_transaction_read_only=on -c statement_timeout={EXPLAIN_STATEMENT_TIMEOUT_MS}",
+            )
+        return self._connection
+
+    def _explain(self, shape, query, vars, seconds):
+        # Runs on the executor's only thread, which owns the connection.
+        analyze = bool(_READ_ONLY_STATEMENT.match(query)) and not _SIDE_EFFECTS.search(query)
+        explain = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+        try:
+            connection = self._get_connection()
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(explain + query, vars)
+                    plan = "\n".join(row[0] for row in cursor.fetchall())
+            finally:
+                connection.rollback()
+
+            with open(self.explain_file, 'a') as fp:
+                fp.write(
+                    f"-- {datetime.now(timezone.utc).isoformat()} {seconds * 1000:.1f} ms\n"
+                    f"-- {shape}\n{plan}\n\n"
+                )
+        except Exception:
+            # Nobody waits on the result; an exception left in the future would go unnoticed.
+            logger.exception(f"Could not explain slow query: {shape}")
+
+
+def init_slow_query_log(app):
+    """
+    Log statements run on the request pool that take longer than `SLOW_QUERY_THRESHOLD` seconds.
+
+    Outside production the plans of the first `SLOW_QUERY_EXPLAIN_LIMIT` occurrences of each
+    statement shape are appended to `SLOW_QUERY_EXPLAIN_FILE`, see `SlowQueryLog`.
+    """
+    threshold = app.config.get('SLOW_QUERY_THRESHOLD')
+    if not threshold:
+        return
+
+    explain_limit = app.config.get('SLOW_QUERY_EXPLAIN_LIMIT') if app.config.get('APP_ENV') != 'production' else 0
+    slow_query_log = SlowQueryLog(
+        config, threshold, explain_limit=explain_limit, explain_file=app.config.get('SLOW_QUERY_EXPLAIN_FILE')
+    )
+    os.register_at_fork(after_in_child=slow_query_log.reset_after_fork)
+    add_query_listener(slow_query_log.record)
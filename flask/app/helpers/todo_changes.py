@@ -0,0 +1,163 @@
+import os
+import queue
+import select
+import threading
+import time
+from collections import defaultdict
+
+import psycopg2
+
+from common.app_config import config
+from common.app_logger import logger
+from common.repositories.todo import get_todo_change_channel
+
+class TodoChangeStreamsFullError(Exception):
+    pass
+
+
+# Sent to a subscriber instead of a change event when some of its events were lost.
+RESYNC = object()
+
+
+class TodoChangeListener:
+    """
+    Fan out todo change notifications to the streams open in this worker process.
+
+    Every subscriber shares one LISTEN connection, and a person's channel is listened to
+    while at least one of their streams is open. If notifications may have been missed
+    (the connection dropped, or a subscriber fell too far behind) the affected subscribers
+    receive `RESYNC` and are expected to catch up through `/todo/changes`.
+
+    Every open stream holds a server thread, so at most `max_subscribers` are open at once;
+    `subscribe` raises `TodoChangeStreamsFullError` beyond that.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.max_subscribers = (
+            max(config.SERVER_THREADS - 1, 0) if config.TODO_CHANGE_STREAM_MAX_STREAMS is None
+            else config.TODO_CHANGE_STREAM_MAX_STREAMS
+        )
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._connection = None
+        self._thread = None
+        # Connections inherited from a parent process. They share its socket, so closing
+        # (or garbage collecting) them would end the parent's session; keep them referenced.
+        self._inherited_connections = []
+
+    def subscribe(self, person_id: str) -> queue.Queue:
+        channel = get_todo_change_channel(person_id)
+        subscriber = queue.Queue(maxsize=self.config.TODO_CHANGE_STREAM_QUEUE_SIZE)
+        with self._lock:
+            if sum(len(subscribers) for subscribers in self._subscribers.values()) >= self.max_subscribers:
+                raise TodoChangeStreamsFullError("Too many todo change streams are open")
+            self._ensure_listening()
+            if channel not in self._subscribers:
+                self._listen(channel)
+            self._subscribers[channel].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, person_id: str, subscriber: queue.Queue) -> None:
+        channel = get_todo_change_channel(person_id)
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if not subscribers or subscriber not in subscribers:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[channel]
+                if self._connection is not None and not self._connection.closed:
+                    with self._connection.cursor() as cursor:
+                        cursor.execute(f'UNLISTEN "{channel}"')
+
+    def get_subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def reset_after_fork(self):
+        """Streams and the listener thread only exist in the parent; start over in a forked child."""
+        self._lock = threading.Lock()
+        if self._connection is not None:
+            self._inherited_connections.append(self._connection)
+        self._connection = None
+        self._thread = None
+        self._subscribers.clear()
+
+    def _ensure_listening(self):
+        if self._connection is None or self._connection.closed:
+            self._connection = psycopg2.connect(
+                host=self.config.POSTGRES_HOST,
+                port=self.config.POSTGRES_PORT,
+                user=self.config.POSTGRES_USER,
+                password=self.config.POSTGRES_PASSWORD,
+                dbname=self.config.POSTGRES_DB,
+            )
+            self._connection.autocommit = True
+            for channel in self._subscribers:
+                self._listen(channel)
+
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="todo-change-listener", daemon=True)
+            self._thread.start()
+
+    def _listen(self, channel):
+        with self._connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{channel}"')
+
+    def _run(self):
+        while True:
+            with self._lock:
+                connection = self._connection
+                if connection is None and not self._subscribers:
+                    # Nobody is listening; the next subscriber starts a new thread.
+                    self._thread = None
+                    return
+            try:
+                if connection is None or connection.closed:
+                    raise psycopg2.InterfaceError("Listener connection is closed")
+                if select.select([connection], [], [], self.config.TODO_CHANGE_STREAM_KEEPALIVE) == ([], [], []):
+                    continue
+                with self._lock:
+                    connection.poll()
+                    notifications = list(connection.notifies)
+                    connection.notifies.clear()
+                    for notification in notifications:
+                        for subscriber in self._subscribers.get(notification.channel, ()):
+                            self._deliver(subscriber, notification.payload)
+            except (psycopg2.Error, OSError, ValueError):
+                logger.exception("Todo change listener connection lost, reconnecting.")
+                time.sleep(self.config.TODO_CHANGE_LISTENER_RECONNECT_DELAY)
+                with self._lock:
+                    if self._connection is connection:
+                        self._close()
+                    if not self._subscribers:
+                        continue
+                    try:
+                        self._ensure_listening()
+                    except psycopg2.Error:
+                        continue
+                    for subscribers in self._subscribers.values():
+                        for subscriber in subscribers:
+                            self._deliver(subscriber, RESYNC)
+
+    def _deliver(self, subscriber, event):
+        try:
+            subscriber.put_nowait(event)
+        except queue.Full:
+            # The stream is not keeping up; drop its backlog and have the client resync instead.
+            while not subscriber.empty():
+                subscriber.get_nowait()
+            subscriber.put_nowait(RESYNC)
+
+    def _close(self):
+        try:
+            if self._connection is not None:
+                self._connection.close()
+        except psycopg2.Error:
+            pass
+        self._connection = None
+
+
+todo_change_listener = TodoChangeListener(config)
+os.register_at_fork(after_in_child=todo_change_listener.reset_after_fork)
@@ -0,0 +1,54 @@
+revision = "0000000008"
+down_revision = "0000000007"
+
+
+def upgrade(migration):
+    migration.create_table(
+        "outbox_message",
+        """
+            "entity_id" varchar(32) NOT NULL,
+            "version" varchar(32) NOT NULL,
+            "previous_version" varchar(32) DEFAULT '00000000000000000000000000000000',
+            "active" boolean DEFAULT true,
+            "changed_by_id" varchar(32) DEFAULT NULL,
+            "changed_on" timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+            "queue_name" varchar(255) NOT NULL,
+            "payload" jsonb NOT NULL,
+            "status" varchar(16) NOT NULL DEFAULT 'PENDING',
+            "created_on" timestamp DEFAULT CURRENT_TIMESTAMP,
+            "sent_on" timestamp NULL DEFAULT NULL,
+            PRIMARY KEY ("entity_id")
+        """
+    )
+    # Partial index so the relay's polling query only ever scans pending rows.
+    migration.execute(
+        "CREATE INDEX outbox_message_pending_created_on_ind ON outbox_message (created_on) WHERE status = 'PENDING';"
+    )
+
+    # Create the audit table
+    migration.create_table(
+        "outbox_message_audit",
+        """
+            "entity_id" varchar(32) NOT NULL,
+            "version" varchar(32) NOT NULL,
+            "previous_version" varchar(32) DEFAULT '00000000000000000000000000000000',
+            "active" boolean DEFAULT true,
+            "changed_by_id" varchar(32) DEFAULT NULL,
+            "changed_on" timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+            "queue_name" varchar(255) NOT NULL,
+            "payload" jsonb NOT NULL,
+            "status" varchar(16) NOT NULL DEFAULT 'PENDING',
+            "created_on" timestamp DEFAULT CURRENT_TIMESTAMP,
+            "sent_on" timestamp NULL DEFAULT NULL,
+            PRIMARY KEY ("entity_id", "version")
+        """
+    )
+
+    migration.update_version_table(version=revision)
+
+
+def downgrade(migration):
+    migration.drop_table(table_name="outbox_message")
+    migration.drop_table(table_name="outbox_message_audit")
+
+    migration.update_version_table(version=down_revision)
@@ -0,0 +1,35 @@
+revision = "0000000009"
+down_revision = "0000000008"
+
+
+def upgrade(migration):
+    migration.add_column(
+        table_name="outbox_message",
+        column_name="priority",
+        datatype="smallint NOT NULL DEFAULT 0",
+    )
+    migration.add_column(
+        table_name="outbox_message_audit",
+        column_name="priority",
+        datatype="smallint NOT NULL DEFAULT 0",
+    )
+
+    # The relay now claims pending rows highest priority first.
+    migration.remove_index("outbox_message", "outbox_message_pending_created_on_ind")
+    migration.execute(
+        "CREATE INDEX outbox_message_pending_priority_created_on_ind "
+        "ON outbox_message (priority DESC, created_on) WHERE status = 'PENDING';"
+    )
+
+    migration.update_version_table(version=revision)
+
+
+def downgrade(migration):
+    migration.remove_index("outbox_message", "outbox_message_pending_priority_created_on_ind")
+    migration.execute(
+        "CREATE INDEX outbox_message_pending_created_on_ind ON outbox_message (created_on) WHERE status = 'PENDING';"
+    )
+    migration.drop_column(table_name="outbox_message", column_name="priority")
+    migration.drop_column(table_name="outbox_message_audit", column_name="priority")
+
+    migration.update_version_table(version=down_revision)
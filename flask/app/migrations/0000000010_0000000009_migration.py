@@ -0,0 +1,15 @@
+revision = "0000000010"
+down_revision = "0000000009"
+
+
+def upgrade(migration):
+    # Backs the /todo/changes delta sync feed, which reads a person's todos changed after a watermark.
+    migration.add_index("todo", "todo_person_id_changed_on_ind", "person_id, changed_on")
+
+    migration.update_version_table(version=revision)
+
+
+def downgrade(migration):
+    migration.remove_index("todo", "todo_person_id_changed_on_ind")
+
+    migration.update_version_table(version=down_revision)
@@ -0,0 +1,58 @@
+revision = "0000000011"
+down_revision = "0000000010"
+
+
+def upgrade(migration):
+    migration.create_table(
+        "refresh_token",
+        """
+            "entity_id" varchar(32) NOT NULL,
+            "version" varchar(32) NOT NULL,
+            "previous_version" varchar(32) DEFAULT '00000000000000000000000000000000',
+            "active" boolean DEFAULT true,
+            "changed_by_id" varchar(32) DEFAULT NULL,
+            "changed_on" timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+            "person_id" varchar(32) NOT NULL,
+            "email_id" varchar(32) NOT NULL,
+            "token_hash" varchar(64) NOT NULL,
+            "family_id" varchar(32) NOT NULL,
+            "created_on" timestamp DEFAULT CURRENT_TIMESTAMP,
+            "expires_on" timestamp NOT NULL,
+            "used_on" timestamp NULL DEFAULT NULL,
+            "revoked_on" timestamp NULL DEFAULT NULL,
+            PRIMARY KEY ("entity_id")
+        """
+    )
+    migration.execute("CREATE UNIQUE INDEX refresh_token_token_hash_ind ON refresh_token (token_hash);")
+    migration.add_index("refresh_token", "refresh_token_person_id_family_id_ind", "person_id, family_id")
+
+    # Create the audit table
+    migration.create_table(
+        "refresh_token_audit",
+        """
+            "entity_id" varchar(32) NOT NULL,
+            "version" varchar(32) NOT NULL,
+            "previous_version" varchar(32) DEFAULT '00000000000000000000000000000000',
+            "active" boolean DEFAULT true,
+            "changed_by_id" varchar(32) DEFAULT NULL,
+            "changed_on" timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+            "person_id" varchar(32) NOT NULL,
+            "email_id" varchar(32) NOT NULL,
+            "token_hash" varchar(64) NOT NULL,
+            "family_id" varchar(32) NOT NULL,
+            "created_on" timestamp DEFAULT CURRENT_TIMESTAMP,
+            "expires_on" timestamp NOT NULL,
+            "used_on" timestamp NULL DEFAULT NULL,
+            "revoked_on" timestamp NULL DEFAULT NULL,
+            PRIMARY KEY ("entity_id", "version")
+        """
+    )
+
+    migration.update_version_table(version=revision)
+
+
+def downgrade(migration):
+    migration.drop_table(table_name="refresh_token")
+    migration.drop_table(table_name="refresh_token_audit")
+
+    migration.update_version_table(version=down_revision)
@@ -0,0 +1,46 @@
+revision = "0000000012"
+down_revision = "0000000011"
+
+
+def upgrade(migration):
+    migration.create_table(
+        "access_token_revocation",
+        """
+            "entity_id" varchar(32) NOT NULL,
+            "version" varchar(32) NOT NULL,
+            "previous_version" varchar(32) DEFAULT '00000000000000000000000000000000',
+            "active" boolean DEFAULT true,
+            "changed_by_id" varchar(32) DEFAULT NULL,
+            "changed_on" timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+            "person_id" varchar(32) NOT NULL,
+            "revoked_before" timestamp NOT NULL,
+            PRIMARY KEY ("entity_id")
+        """
+    )
+    # Workers reload the revocations newer than the access token lifetime on an interval.
+    migration.add_index("access_token_revocation", "access_token_revocation_revoked_before_ind", "revoked_before")
+
+    # Create the audit table
+    migration.create_table(
+        "access_token_revocation_audit",
+        """
+            "entity_id" varchar(32) NOT NULL,
+            "version" varchar(32) NOT NULL,
+            "previous_version" varchar(32) DEFAULT '00000000000000000000000000000000',
+            "active" boolean DEFAULT true,
+            "changed_by_id" varchar(32) DEFAULT NULL,
+            "changed_on" timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+            "person_id" varchar(32) NOT NULL,
+            "revoked_before" timestamp NOT NULL,
+            PRIMARY KEY ("entity_id", "version")
+        """
+    )
+
+    migration.update_version_table(version=revision)
+
+
+def downgrade(migration):
+    migration.drop_table(table_name="access_token_revocation")
+    migration.drop_table(table_name="access_token_revocation_audit")
+
+    migration.update_version_table(version=down_revision)
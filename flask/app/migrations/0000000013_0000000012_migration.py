@@ -0,0 +1,52 @@
+from lib.online import add_index_concurrently, backfill_in_batches, remove_index_concurrently
+
+revision = "0000000013"
+down_revision = "0000000012"
+
+
+def upgrade(migration):
+    # The change feed pages on change_seq: changed_on has whole-second precision, is set
+    # before commit, and is shared by every row of a bulk save.
+    migration.add_column(table_name="todo", column_name="change_seq", datatype="bigint")
+    migration.add_column(table_name="todo_audit", column_name="change_seq", datatype="bigint")
+    migration.execute("CREATE SEQUENCE IF NOT EXISTS todo_change_seq;")
+
+    # Every save takes the next number, whichever code path writes the row. Writers of one
+    # person's todos take turns until they commit, so that person's numbers become visible in
+    # order and a reader never sees a number before a smaller one that is still uncommitted.
+    migration.execute(
+        """
+        CREATE OR REPLACE FUNCTION todo_set_change_seq() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtext('todo_change_seq:' || NEW.person_id));
+            NEW.change_seq := nextval('todo_change_seq');
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    # The steps below commit on their own, so a failed run is re-run from the top with the trigger in place.
+    migration.execute("DROP TRIGGER IF EXISTS todo_set_change_seq ON todo;")
+    migration.execute(
+        "CREATE TRIGGER todo_set_change_seq BEFORE INSERT OR UPDATE ON todo "
+        "FOR EACH ROW EXECUTE FUNCTION todo_set_change_seq();"
+    )
+
+    # The trigger numbers the existing rows as the backfill touches them.
+    backfill_in_batches(migration, "todo", "change_seq = nextval('todo_change_seq')", "change_seq IS NULL")
+    add_index_concurrently(migration, "todo", "todo_person_id_change_seq_ind", "person_id, change_seq")
+    remove_index_concurrently(migration, "todo_person_id_changed_on_ind")
+
+    migration.update_version_table(version=revision)
+
+
+def downgrade(migration):
+    add_index_concurrently(migration, "todo", "todo_person_id_changed_on_ind", "person_id, changed_on")
+    remove_index_concurrently(migration, "todo_person_id_change_seq_ind")
+    migration.execute("DROP TRIGGER IF EXISTS todo_set_change_seq ON todo;")
+    migration.execute("DROP FUNCTION IF EXISTS todo_set_change_seq();")
+    migration.drop_column(table_name="todo", column_name="change_seq")
+    migration.drop_column(table_name="todo_audit", column_name="change_seq")
+    migration.execute("DROP SEQUENCE IF EXISTS todo_change_seq;")
+
+    migration.update_version_table(version=down_revision)
@@ -0,0 +1,42 @@
+revision = "0000000014"
+down_revision = "0000000013"
+
+TABLE_NAMES = ("access_token_revocation", "access_token_revocation_audit")
+
+
+def _alter_revoked_before(migration, table_name, from_type, to_type, using):
+    # Each table commits on its own; skipping the converted ones lets a failed run be re-run.
+    migration.execute(
+        f"""
+        DO $$
+        BEGIN
+            IF (SELECT data_type FROM information_schema.columns
+                WHERE table_name = '{table_name}' AND column_name = 'revoked_before') = '{from_type}' THEN
+                ALTER TABLE {table_name} ALTER COLUMN revoked_before TYPE {to_type} USING {using};
+            END IF;
+        END
+        $$;
+        """
+    )
+
+
+def upgrade(migration):
+    # Epoch seconds compared directly with a token's `iat`. rococo saves timestamps with
+    # whole-second precision, which made a token issued right after a revocation look older.
+    for table_name in TABLE_NAMES:
+        _alter_revoked_before(
+            migration, table_name, "timestamp without time zone", "double precision",
+            "extract(epoch FROM revoked_before)"
+        )
+
+    migration.update_version_table(version=revision)
+
+
+def downgrade(migration):
+    for table_name in TABLE_NAMES:
+        _alter_revoked_before(
+            migration, table_name, "double precision", "timestamp",
+            "to_timestamp(revoked_before) AT TIME ZONE 'UTC'"
+        )
+
+    migration.update_version_table(version=down_revision)
@@ -0,0 +1,96 @@
+"""
+Schema changes that keep big tables available while they run.
+
+`migration.add_index` builds an index with a plain `CREATE INDEX`, which blocks writes to the
+table until the build finishes. `add_index_concurrently` builds it without blocking writes,
+and `backfill_in_batches` updates rows in short transactions instead of one long one.
+
+Migrations import these as `from lib.online import ...`; the runner skips the `lib` package.
+"""
+import logging
+import time
+
+
+def _execute_autocommit(migration, query, args=None):
+    # CONCURRENTLY statements cannot run inside a transaction block.
+    with migration.db_adapter as adapter:
+        adapter._connection.autocommit = True
+        with adapter._connection.cursor() as cursor:
+            cursor.execute(query, args)
+            return cursor.fetchall() if cursor.description else None
+
+
+def _get_index_validity(migration, index_name):
+    rows = _execute_autocommit(
+        migration,
+        """
+        SELECT i.indisvalid
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s;
+        """,
+        (index_name,)
+    )
+    return rows[0][0] if rows else None
+
+
+def add_index_concurrently(migration, table_name, index_name, indexed_column, unique=False):
+    """
+    Build an index without blocking writes to `table_name`.
+
+    A concurrent build that fails (or is interrupted) leaves an invalid index behind; it is
+    dropped and rebuilt, so a failed migration can simply be run again.
+    """
+    is_valid = _get_index_validity(migration, index_name)
+    if is_valid:
+        logging.info(f"Index {index_name} already exists. Skipping creation...")
+        return
+    if is_valid is False:
+        logging.info(f"Index {index_name} is left over from a failed build. Rebuilding...")
+        remove_index_concurrently(migration, index_name)
+
+    unique_clause = "UNIQUE " if unique else ""
+    _execute_autocommit(
+        migration,
+        f"CREATE {unique_clause}INDEX CONCURRENTLY {index_name} ON {table_name} ({indexed_column});"
+    )
+
+
+def remove_index_concurrently(migration, index_name):
+    """Drop an index without blocking reads or writes on its table."""
+    _execute_autocommit(migration, f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};")
+
+
+def backfill_in_batches(migration, table_name, set_clause, where_clause, batch_size=1000, pause=0.0):
+    """
+    Run `UPDATE table_name SET set_clause WHERE where_clause` a batch of rows at a time.
+
+    Each batch commits on its own, so row locks are held briefly and replicas keep up.
+    `where_clause` must stop matching a row once it has been updated (for example
+    `"new_column IS NULL"`), otherwise the backfill never finishes.
+
+    :param pause: Seconds to sleep between batches, to leave I/O for live traffic
+    :return: The number of rows updated
+    """
+    query = f"""
+        UPDATE {table_name} SET {set_clause}
+        WHERE entity_id IN (
+            SELECT entity_id FROM {table_name}
+            WHERE {where_clause}
+            LIMIT %s
+        );
+    """
+    updated = 0
+    with migration.db_adapter as adapter:
+        while True:
+            with adapter._connection.cursor() as cursor:
+                cursor.execute(query, (batch_size,))
+                rowcount = cursor.rowcount
+            adapter._connection.commit()
+            updated += rowcount
+            if rowcount == 0:
+                break
+            logging.info(f"Backfilled {updated} rows of {table_name}...")
+            if pause:
+                time.sleep(pause)
+    return updated
@@ -1,3 +1,4 @@
+from app.views.admin import admin_api
 from app.views.auth import auth_api
 from app.views.organization import organization_api
 from app.views.person import person_api
@@ -8,3 +9,4 @@ def initialize_views(api):
     api.add_namespace(organization_api)
     api.add_namespace(person_api)
     api.add_namespace(todo_api)
+    api.add_namespace(admin_api)
@@ -0,0 +1,54 @@
+import math
+from datetime import datetime, timezone
+
+from flask import Response, request
+from flask_restx import Namespace, Resource
+
+from app.helpers.decorators import admin_required
+from app.helpers.query_budget import query_budget
+from app.helpers.response import get_failure_response
+from common.utils.sampling_profiler import ProfilerBusyError, format_collapsed_stacks, sampling_profiler
+
+admin_api = Namespace('admin', description="Operational APIs, protected by the admin token")
+
+
+@admin_api.route('/profile')
+class Profile(Resource):
+
+    @query_budget(0)
+    @admin_required
+    @admin_api.doc(params={
+        'seconds': 'How long to sample, capped by PROFILER_MAX_SECONDS (default 10)',
+        'rate': 'Samples per second, capped by PROFILER_MAX_SAMPLE_RATE (default 100)',
+    })
+    def get(self):
+        """
+        Sample the stacks of every thread in the worker process that answers, and return them collapsed.
+
+        The body is one `thread;frame;...;frame count` line per distinct stack, ready for
+        flamegraph.pl or speedscope. Under gunicorn only the worker that takes the request
+        is sampled.
+        """
+        try:
+            seconds = float(request.args.get("seconds", 10))
+            rate = int(request.args.get("rate", 100))
+        except ValueError:
+            return get_failure_response("'seconds' and 'rate' must be numbers.", status_code=400)
+        if not math.isfinite(seconds):
+            return get_failure_response("'seconds' must be a finite number.", status_code=400)
+
+        try:
+            profile = sampling_profiler.profile(seconds, rate)
+        except ProfilerBusyError as e:
+            return get_failure_response(str(e), status_code=409)
+
+        file_name = f"profile-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.collapsed"
+        return Response(
+            format_collapsed_stacks(profile["stacks"]),
+            mimetype="text/plain",
+            headers={
+                "Content-Disposition": f'attachment; filename="{file_name}"',
+                "X-Profile-Samples": str(profile["samples"]),
+                "X-Profile-Overhead": f"{profile['overhead']:.4f}",
+            },
+        )
@@ -58,7 +58,7 @@ class Login(Resource):
         validate_required_fields(parsed_body)
 
         auth_service = AuthService(config)
-        access_token, expiry = auth_service.login_user_by_email_password(
+        access_token, expiry, refresh_token, refresh_expiry = auth_service.login_user_by_email_password(
             parsed_body['email'], 
             parsed_body['password']
         )
@@ -66,7 +66,36 @@ class Login(Resource):
         person_service = PersonService(config)
         person = person_service.get_person_by_email_address(email_address=parsed_body['email'])
 
-        return get_success_response(person=person.as_dict(), access_token=access_token, expiry=expiry)
+        return get_success_response(
+            person=person.as_dict(),
+            access_token=access_token,
+            expiry=expiry,
+            refresh_token=refresh_token,
+            refresh_expiry=refresh_expiry
+        )
+
+
+@auth_api.route('/refresh', doc=dict(description="Exchange a refresh token for a new access token"))
+class Refresh(Resource):
+    @auth_api.expect(
+        {'type': 'object', 'properties': {
+            'refresh_token': {'type': 'string'}
+        }}
+    )
+    def post(self):
+        parsed_body = parse_request_body(request, ['refresh_token'])
+        validate_required_fields(parsed_body)
+
+        auth_service = AuthService(config)
+        access_token, expiry, refresh_token, refresh_expiry = auth_service.refresh_access_token(
+            parsed_body['refresh_token']
+        )
+        return get_success_response(
+            access_token=access_token,
+            expiry=expiry,
+            refresh_token=refresh_token,
+            refresh_expiry=refresh_expiry
+        )
 
 
 @auth_api.route('/forgot_password', doc=dict(description="Send reset password link"))
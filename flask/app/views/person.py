@@ -3,6 +3,7 @@ from flask_restx import Namespace, Resource
 
 from app.helpers.response import get_success_response, parse_request_body, validate_required_fields
 from app.helpers.decorators import login_required
+from app.helpers.query_budget import query_budget
 from common.services.person import PersonService
 from common.app_config import config
 
@@ -13,6 +14,7 @@ person_api = Namespace('person', description="Person-related APIs")
 @person_api.route('/me')
 class Me(Resource):
     
+    @query_budget(2)
     @login_required()
     def get(self, person):
         return get_success_response(person=person)
@@ -1,13 +1,23 @@
-from flask import request
+import queue
+from datetime import datetime, timezone
+
+import psycopg2
+from flask import Response, request
 from flask_restx import Namespace, Resource
 
 from app.helpers.response import (
     get_success_response,
     get_failure_response,
+    get_streaming_success_response,
+    parse_list_shape,
     parse_request_body,
+    shape_list,
     validate_required_fields,
 )
 from app.helpers.decorators import login_required
+from app.helpers.query_budget import query_budget
+from app.helpers.todo_changes import todo_change_listener, RESYNC, TodoChangeStreamsFullError
+from common.models.todo import TodoRow
 from common.services.todo import TodoService
 from common.app_config import config
 
@@ -17,22 +27,28 @@ todo_api = Namespace("todo", description="Todo-related APIs")
 
 @todo_api.route("")
 class Todos(Resource):
-    @login_required()
+    @query_budget(1)
+    @login_required(stateless=True)
     def get(self, person):
-        """Get all todos for the current user with optional filtering."""
+        """Get all todos for the current user with optional filtering, sparse fields and streaming."""
         filter_type = request.args.get("filter", "all")  # all, active, completed
+        stream = request.args.get("stream")  # json, ndjson
+        fields, columnar = parse_list_shape(request, TodoRow)  # ?fields=entity_id,title&shape=rows|columns
         todo_service = TodoService(config)
 
-        if filter_type == "completed":
-            todos = todo_service.get_completed_todos(person.entity_id)
-        elif filter_type == "active":
-            todos = todo_service.get_active_todos(person.entity_id)
-        else:
-            todos = todo_service.get_todos_by_person(person.entity_id)
+        if stream in ("json", "ndjson"):
+            if columnar:
+                return get_failure_response("A columnar shape cannot be streamed.", status_code=400)
+            batches = todo_service.iter_todos_by_person(person.entity_id, filter_type)
+            if fields:
+                batches = (shape_list(batch, fields) for batch in batches)
+            return get_streaming_success_response("todos", batches, ndjson=stream == "ndjson")
 
-        return get_success_response(todos=[todo.as_dict() for todo in todos])
+        todos = todo_service.get_todo_rows_by_person(person.entity_id, filter_type)
+        return get_success_response(todos=shape_list(todos, fields, columnar))
 
-    @login_required()
+    @query_budget(3)
+    @login_required(stateless=True)
     @todo_api.expect(
         {
             "type": "object",
@@ -52,10 +68,11 @@ class Todos(Resource):
             title=parsed_body["title"],
         )
         return get_success_response(
-            todo=todo.as_dict(), message="Todo created successfully."
+            todo=todo, message="Todo created successfully."
         )
 
-    @login_required()
+    @query_budget(4)
+    @login_required(stateless=True)
     def delete(self, person):
         """Delete all completed todos."""
         todo_service = TodoService(config)
@@ -65,7 +82,8 @@ class Todos(Resource):
 
 @todo_api.route("/complete")
 class TodoCompleteAll(Resource):
-    @login_required()
+    @query_budget(4)
+    @login_required(stateless=True)
     def post(self, person):
         """Mark all todos as completed."""
         todo_service = TodoService(config)
@@ -75,7 +93,8 @@ class TodoCompleteAll(Resource):
 
 @todo_api.route("/activate")
 class TodoActivateAll(Resource):
-    @login_required()
+    @query_budget(4)
+    @login_required(stateless=True)
     def post(self, person):
         """Mark all todos as active."""
         todo_service = TodoService(config)
@@ -83,9 +102,124 @@ class TodoActivateAll(Resource):
         return get_success_response(message="All todos marked as active.")
 
 
+@todo_api.route("/changes")
+class TodoChanges(Resource):
+    @query_budget(1)
+    @login_required(stateless=True)
+    def get(self, person):
+        """Get the todos changed since a watermark, including deleted ones."""
+        fields, columnar = parse_list_shape(request, TodoRow)
+        since = request.args.get("since")
+        if since and since.isdigit():
+            since = int(since)
+        elif since:
+            # A timestamp watermark, handed out before change sequence numbers.
+            try:
+                since = datetime.fromisoformat(since)
+            except ValueError:
+                return get_failure_response("'since' must be a watermark returned by this endpoint.", status_code=400)
+            if since.tzinfo:
+                # changed_on is stored as naive UTC.
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        else:
+            since = None
+
+        todo_service = TodoService(config)
+        todos, watermark, has_more = todo_service.get_changes_since(person.entity_id, since)
+        if isinstance(watermark, datetime):
+            watermark = watermark.isoformat()
+        elif watermark is not None:
+            watermark = str(watermark)
+        return get_success_response(
+            todos=shape_list(todos, fields, columnar),
+            watermark=watermark,
+            has_more=has_more,
+        )
+
+
+@todo_api.route("/stream")
+class TodoStream(Resource):
+    @query_budget(0)
+    @login_required(stateless=True)
+    def get(self, person):
+        """Push the current user's todo changes as Server-Sent Events."""
+        person_id = person.entity_id
+        try:
+            subscriber = todo_change_listener.subscribe(person_id)
+        except TodoChangeStreamsFullError:
+            response = get_failure_response("Too many todo change streams are open. Please try again.", status_code=503)
+            response.headers["Retry-After"] = str(config.TODO_CHANGE_STREAM_RETRY_AFTER)
+            return response
+        except psycopg2.Error:
+            return get_failure_response("Todo change stream is unavailable.", status_code=503)
+
+        keepalive = config.TODO_CHANGE_STREAM_KEEPALIVE
+
+        # A plain generator rather than stream_with_context, so the request's pooled
+        # database connection is returned as soon as the stream starts.
+        def generate():
+            while True:
+                try:
+                    event = subscriber.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is RESYNC:
+                    yield "event: resync\ndata: {}\n\n"
+                else:
+                    yield f"event: change\ndata: {event}\n\n"
+
+        response = Response(generate(), mimetype="text/event-stream")
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"
+        response.call_on_close(lambda: todo_change_listener.unsubscribe(person_id, subscriber))
+        return response
+
+
+@todo_api.route("/batch")
+class TodoBatch(Resource):
+    @query_budget(4)
+    @login_required(stateless=True)
+    @todo_api.expect(
+        {
+            "type": "object",
+            "properties": {
+                "operations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "op": {"type": "string", "enum": ["create", "toggle", "update", "delete"]},
+                            "todo_id": {"type": "string"},
+                            "title": {"type": "string"},
+                            "is_completed": {"type": "boolean"},
+                        },
+                    },
+                },
+            },
+        }
+    )
+    def post(self, person):
+        """Apply several todo operations in one request."""
+        parsed_body = parse_request_body(request, ["operations"])
+        operations = parsed_body["operations"]
+
+        if not isinstance(operations, list) or not operations:
+            return get_failure_response("'operations' must be a non-empty list.", status_code=400)
+        if len(operations) > config.TODO_BATCH_MAX_OPERATIONS:
+            return get_failure_response(
+                f"A batch can contain at most {config.TODO_BATCH_MAX_OPERATIONS} operations.", status_code=400
+            )
+
+        todo_service = TodoService(config)
+        results = todo_service.apply_batch(person.entity_id, operations)
+        return get_success_response(results=results)
+
+
 @todo_api.route("/<string:todo_id>")
 class TodoItem(Resource):
-    @login_required()
+    @query_budget(1)
+    @login_required(stateless=True)
     def get(self, todo_id, person):
         """Get a specific todo."""
         todo_service = TodoService(config)
@@ -94,9 +228,10 @@ class TodoItem(Resource):
         if not todo or todo.person_id != person.entity_id:
             return get_failure_response("Todo not found", status_code=404)
 
-        return get_success_response(todo=todo.as_dict())
+        return get_success_response(todo=todo)
 
-    @login_required()
+    @query_budget(4)
+    @login_required(stateless=True)
     @todo_api.expect(
         {
             "type": "object",
@@ -117,17 +252,18 @@ class TodoItem(Resource):
         if not todo or todo.person_id != person.entity_id:
             return get_failure_response("Todo not found", status_code=404)
 
-        updated_todo = todo_service.update_todo_by_id(
-            entity_id=todo_id,
+        updated_todo = todo_service.update_todo(
+            todo,
             title=parsed_body["title"],
             is_completed=parsed_body["is_completed"],
         )
         return get_success_response(
-            todo=updated_todo.as_dict(), message="Todo updated successfully."
+            todo=updated_todo, message="Todo updated successfully."
         )
         
 
-    @login_required()
+    @query_budget(4)
+    @login_required(stateless=True)
     def delete(self, todo_id, person):
         """Delete a todo."""
         todo_service = TodoService(config)
@@ -142,7 +278,8 @@ class TodoItem(Resource):
 
 @todo_api.route("/<string:todo_id>/toggle")
 class TodoToggle(Resource):
-    @login_required()
+    @query_budget(4)
+    @login_required(stateless=True)
     def put(self, todo_id, person):
         """Toggle the completion status of a todo."""
         todo_service = TodoService(config)
@@ -151,9 +288,9 @@ class TodoToggle(Resource):
         if not todo or todo.person_id != person.entity_id:
             return get_failure_response("Todo not found", status_code=404)
 
-        updated_todo = todo_service.toggle_todo_by_id(todo_id)
+        updated_todo = todo_service.toggle_todo(todo)
         return get_success_response(
-            todo=updated_todo.as_dict(),
+            todo=updated_todo,
             message=f"Todo marked as {'completed' if updated_todo.is_completed else 'active'}.",
         )
 
@@ -0,0 +1,65 @@
+"""
+Benchmark of serializing a list of todos through the response JSON providers.
+
+Compares the previous path (stdlib-based DefaultJSONProvider over `todo.as_dict()`
+dicts) with the orjson provider serializing the Todo dataclasses directly.
+
+Usage (from the flask directory, with the app environment loaded):
+
+    python -m benchmarks.json_provider --todos 10000 --repeat 5
+"""
+import argparse
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.helpers.json_provider import OrjsonProvider
+from common.models import Todo
+
+
+def _best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--todos", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    person_id = "0" * 32
+    todos = [Todo(person_id=person_id, title=f"Todo number {i}", is_completed=bool(i % 2)) for i in range(args.todos)]
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    orjson_provider = OrjsonProvider(app)
+    app.config["JSON_DATETIME_FORMAT"] = "iso"
+    orjson_iso_provider = OrjsonProvider(app)
+
+    cases = [
+        ("default provider, as_dict()", lambda: default_provider.dumps(
+            dict(success=True, todos=[todo.as_dict() for todo in todos])).encode()),
+        ("orjson provider, as_dict()", lambda: orjson_provider.dumps_bytes(
+            dict(success=True, todos=[todo.as_dict() for todo in todos]))),
+        ("orjson provider, dataclasses", lambda: orjson_provider.dumps_bytes(
+            dict(success=True, todos=todos))),
+        ("orjson provider, dataclasses, iso dates", lambda: orjson_iso_provider.dumps_bytes(
+            dict(success=True, todos=todos))),
+    ]
+
+    print(f"{args.todos} todos, best of {args.repeat}")
+    baseline = None
+    for label, func in cases:
+        elapsed, body = _best_of(args.repeat, func)
+        baseline = baseline or elapsed
+        print(f"{label:<42} {elapsed * 1000:>8.1f}ms  {baseline / elapsed:>5.1f}x  {len(body):>10,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Micro-benchmark of MessageSender publishing throughput.
+
+Compares the one-connection-per-message `send_message` path with the batched
+`send_messages` API. RabbitMQ is replaced by a local stand-in that sleeps one
+simulated network round trip wherever pika's BlockingConnection waits for the
+broker, so the numbers isolate protocol chatter from broker performance.
+
+Usage (from the flask directory, with the app environment loaded):
+
+    python -m benchmarks.message_sender --messages 2000 --rtt 0.0005
+"""
+import argparse
+import logging
+import time
+
+from common.tasks import send_message
+from common.tasks.send_message import MessageSender
+
+
+class StandInChannel:
+    def __init__(self, connection):
+        self.connection = connection
+        self.is_closed = False
+
+    def exchange_declare(self, *args, **kwargs):
+        self.connection.round_trip()
+
+    def queue_declare(self, *args, **kwargs):
+        self.connection.round_trip()
+
+    def tx_select(self):
+        self.connection.round_trip()
+
+    def tx_commit(self):
+        self.connection.round_trip()
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, mandatory=False):
+        # Publishing is asynchronous in AMQP; only the frames are written.
+        self.connection.published += 1
+
+
+class StandInBlockingConnection:
+    """Mimics the broker round trips made by `pika.BlockingConnection`."""
+
+    rtt = 0.0005
+    HANDSHAKE_ROUND_TRIPS = 4  # TCP connect, protocol header/start, tune/tune-ok, connection.open
+    published = 0
+
+    def __init__(self, parameters):
+        self.is_open = True
+        for _ in range(self.HANDSHAKE_ROUND_TRIPS):
+            self.round_trip()
+
+    def round_trip(self):
+        time.sleep(self.rtt)
+
+    def channel(self):
+        self.round_trip()
+        return StandInChannel(self)
+
+    def close(self):
+        self.round_trip()
+        self.is_open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _run(label, count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {count / elapsed:>12,.0f} msg/s  ({elapsed:.3f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--rtt", type=float, default=0.0005, help="Simulated broker round trip in seconds.")
+    args = parser.parse_args()
+
+    logging.getLogger("common.app_logger").setLevel(logging.WARNING)
+    StandInBlockingConnection.rtt = args.rtt
+    send_message.pika.BlockingConnection = StandInBlockingConnection
+
+    queue_name = "benchmark"
+    messages = [(queue_name, {"event": "WELCOME_EMAIL", "data": {"index": i}, "to_emails": ["user@example.com"]})
+                for i in range(args.messages)]
+    sender = MessageSender()
+
+    def per_message():
+        for queue, data in messages:
+            sender.send_message(queue, data)
+
+    def batched():
+        sender.send_messages(messages)
+
+    print(f"{args.messages} messages, simulated rtt {args.rtt * 1000:.2f}ms")
+    _run("send_message (connection per message)", args.messages, per_message)
+    _run("send_messages (single batch)", args.messages, batched)
+
+
+if __name__ == "__main__":
+    main()
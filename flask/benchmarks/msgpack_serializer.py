@@ -0,0 +1,60 @@
+"""
+Benchmark of encoding a list of todos as MessagePack against JSON.
+
+Compares encode time and payload size, raw and gzip-compressed, for the same
+response document the todo list endpoint returns.
+
+Usage (from the flask directory, with the app environment loaded):
+
+    python -m benchmarks.msgpack_serializer --todos 100 --repeat 50
+"""
+import argparse
+import gzip
+import time
+
+from flask import Flask
+
+from app.helpers.json_provider import OrjsonProvider
+from app.helpers.msgpack_serializer import MsgpackSerializer
+from common.models import Todo
+
+
+def _best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--todos", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    person_id = "0" * 32
+    todos = [Todo(person_id=person_id, title=f"Todo number {i}", is_completed=bool(i % 2)) for i in range(args.todos)]
+    sparse_todos = [{"entity_id": todo.entity_id, "title": todo.title, "is_completed": todo.is_completed} for todo in todos]
+
+    app = Flask(__name__)
+    json_provider = OrjsonProvider(app)
+    msgpack_serializer = MsgpackSerializer(app)
+
+    cases = [
+        ("json, full todos", lambda: json_provider.dumps_bytes(dict(success=True, todos=todos))),
+        ("msgpack, full todos", lambda: msgpack_serializer.dumps(dict(success=True, todos=todos))),
+        ("json, sparse todos", lambda: json_provider.dumps_bytes(dict(success=True, todos=sparse_todos))),
+        ("msgpack, sparse todos", lambda: msgpack_serializer.dumps(dict(success=True, todos=sparse_todos))),
+    ]
+
+    print(f"{args.todos} todos, best of {args.repeat}")
+    print(f"{'':<24} {'encode':>10} {'bytes':>10} {'gzip bytes':>12}")
+    for label, func in cases:
+        elapsed, body = _best_of(args.repeat, func)
+        print(f"{label:<24} {elapsed * 1000:>8.3f}ms {len(body):>10,} {len(gzip.compress(body)):>12,}")
+
+
+if __name__ == "__main__":
+    main()
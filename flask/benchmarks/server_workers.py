@@ -0,0 +1,129 @@
+"""
+Benchmark of request throughput against the number of preforked gunicorn workers.
+
+Serves a stand-in for an authenticated todo list request (JWT verification plus
+serializing 200 todo rows with the app's JSON provider) with gunicorn, using
+`gunicorn.conf.py` with the worker count and bind address overridden, and drives
+it with concurrent keep-alive clients. The database is not involved, so the numbers
+show how the CPU-bound part of a request scales across processes.
+
+Usage (from the flask directory, with the app environment loaded):
+
+    python -m benchmarks.server_workers --workers 1 2 4 --duration 10
+"""
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from uuid import uuid4
+
+import jwt
+from flask import Flask, request
+
+from app.helpers.json_provider import init_json_provider
+from app.helpers.response import get_success_response
+from common.app_config import config
+from common.models import TodoRow
+
+SECRET = "benchmark-secret-" + "x" * 32
+
+
+def create_benchmark_app():
+    app = Flask(__name__)
+    app.config.from_object(config)
+    init_json_provider(app)
+
+    now = datetime.utcnow()
+    person_id = uuid4().hex
+    todos = [
+        TodoRow(uuid4().hex, uuid4().hex, uuid4().hex, True, person_id, now, person_id, f"Todo number {i}", bool(i % 2), now)
+        for i in range(200)
+    ]
+
+    @app.route("/todo")
+    def todo_list():
+        token = request.headers["Authorization"].replace("Bearer ", "")
+        jwt.decode(token, SECRET, algorithms=["HS256"])
+        return get_success_response(todos=todos)
+
+    return app
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start")
+
+
+def _run_clients(port, clients, duration, token):
+    completed = [0] * clients
+    stop_at = time.monotonic() + duration
+
+    def client(index):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        while time.monotonic() < stop_at:
+            connection.request("GET", "/todo", headers={"Authorization": f"Bearer {token}"})
+            response = connection.getresponse()
+            response.read()
+            completed[index] += 1
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(completed) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=4, help="threads per worker")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    token = jwt.encode({"person_id": uuid4().hex, "exp": time.time() + 3600}, SECRET, algorithm="HS256")
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients, {args.threads} threads per worker, {args.duration:.0f}s per run")
+    baseline = None
+    for workers in args.workers:
+        port = _free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py",
+                "--workers", str(workers), "--threads", str(args.threads),
+                "--bind", f"127.0.0.1:{port}", "--log-level", "warning",
+                "benchmarks.server_workers:create_benchmark_app()",
+            ],
+        )
+        try:
+            _wait_until_ready(port)
+            _run_clients(port, args.clients, 1.0, token)  # warm up every worker
+            throughput = _run_clients(port, args.clients, args.duration, token)
+        finally:
+            server.terminate()
+            server.wait()
+        baseline = baseline or throughput
+        print(f"{workers:>2} workers  {throughput:>8.0f} req/s  {throughput / baseline:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark of building todo list responses from query results.
+
+Compares hydrating `Todo` models from result rows (as the generic repository methods
+do) with building read-only `TodoRow` objects, and serializing each with the orjson
+provider. Peak memory is measured with tracemalloc while the objects are alive.
+
+Usage (from the flask directory, with the app environment loaded):
+
+    python -m benchmarks.todo_rows --todos 10000 --repeat 5
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import fields
+from datetime import datetime
+from itertools import starmap
+from uuid import uuid4
+
+from flask import Flask
+
+from app.helpers.json_provider import OrjsonProvider
+from common.models import Todo, TodoRow
+
+
+def _best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def _allocated(func):
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--todos", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Tuples shaped like the cursor results of a `SELECT <TodoRow columns> FROM todo` query.
+    person_id = uuid4().hex
+    now = datetime.utcnow()
+    rows = [
+        (uuid4().hex, uuid4().hex, uuid4().hex, True, person_id, now, person_id, f"Todo number {i}", bool(i % 2), now)
+        for i in range(args.todos)
+    ]
+    column_names = [field.name for field in fields(TodoRow)]
+
+    def hydrate_models():
+        return [Todo.from_dict(dict(zip(column_names, row))) for row in rows]
+
+    def build_rows():
+        return list(starmap(TodoRow, rows))
+
+    provider = OrjsonProvider(Flask(__name__))
+    models = hydrate_models()
+    todo_rows = build_rows()
+
+    print(f"{args.todos} todos, best of {args.repeat}")
+    for label, build, items in [("Todo models", hydrate_models, models), ("TodoRow rows", build_rows, todo_rows)]:
+        build_time, _ = _best_of(args.repeat, build)
+        serialize_time, _ = _best_of(args.repeat, lambda: provider.dumps_bytes(dict(success=True, todos=items)))
+        memory = _allocated(build)
+        print(
+            f"{label:<14} build {build_time * 1000:>8.1f}ms  serialize {serialize_time * 1000:>7.1f}ms  "
+            f"memory {memory / 1024 / 1024:>6.2f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,20 @@
 
 echo Running app..
 
-rococo-postgres rf  # Run forward migrations
+python3 migrate.py  # Run forward migrations; exits early when the schema is current
 echo Done db stuff
 python3 version.py
 if [ "$APP_ENV" == "production" ] || [ "$APP_ENV" == "test" ]
 then
-    waitress-serve --port=5000 --call 'main:create_app'
+    if [ "${SERVER_WORKERS:-1}" -gt 1 ]
+    then
+        # Workers share metrics through files here; start clean so values of a previous run are not summed in.
+        export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}"
+        rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+        gunicorn --config gunicorn.conf.py 'main:create_app()'
+    else
+        waitress-serve --port=5000 --threads="${SERVER_THREADS:-4}" --call 'main:create_app'
+    fi
 else
     python3 main.py
 fi
\ No newline at end of file
@@ -0,0 +1,22 @@
+# Gunicorn settings for the multi-process server mode (SERVER_WORKERS > 1), see docker-entrypoint.sh.
+# Every module-level name here is read as a gunicorn setting, so the app config is imported under another name.
+import os
+
+from common.app_config import config as app_config
+
+bind = "0.0.0.0:5000"
+workers = app_config.SERVER_WORKERS
+threads = app_config.SERVER_THREADS
+worker_class = "gthread"
+timeout = app_config.SERVER_TIMEOUT
+
+# Import and build the app once in the master so workers fork with it already loaded.
+# Process-local resources are rebuilt in each worker, see app.helpers.post_fork.
+preload_app = True
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges (pool sizes, open streams) from /metrics.
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
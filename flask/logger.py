@@ -2,20 +2,19 @@ import logging
 import os
 import sys
 
-import rollbar
-import rollbar.contrib.flask
 from flask import got_request_exception
-from rollbar.logger import RollbarHandler
 
-from common.app_config import get_config
+from common.app_config import config
 
-config = get_config()
+# The API logger does not report to Rollbar; request exceptions still do (see set_request_exception_signal).
+ROLLBAR_ACCESS_TOKEN = None
 
-config.ROLLBAR_ACCESS_TOKEN = None
+# rollbar is only imported when it is going to be used; it is slow to import.
+if ROLLBAR_ACCESS_TOKEN:
+    import rollbar
 
-if config.ROLLBAR_ACCESS_TOKEN:
     rollbar.init(
-        access_token=config.ROLLBAR_ACCESS_TOKEN,
+        access_token=ROLLBAR_ACCESS_TOKEN,
         environment=config.APP_ENV,
         root=os.path.dirname(os.path.realpath(__file__)),
         allow_logging_basic_config=False
@@ -33,6 +32,8 @@ def _get_formatter():
 
 
 def rollbar_except_hook(exc_type, exc_value, traceback):
+    import rollbar
+
     # Report the issue to rollbar here.
     rollbar.report_exc_info((exc_type, exc_value, traceback))
     # display the error as normal here
@@ -50,8 +51,10 @@ def get_console_handler():
 
 
 def get_rollbar_handler():
+    from rollbar.logger import RollbarHandler
+
     loglevel = getattr(logging, config.LOGLEVEL, 'WARN')
-    rollbar_handler = RollbarHandler(access_token=config.ROLLBAR_ACCESS_TOKEN, environment=config.APP_ENV)
+    rollbar_handler = RollbarHandler(access_token=ROLLBAR_ACCESS_TOKEN, environment=config.APP_ENV)
     rollbar_handler.setLevel(loglevel)
     return rollbar_handler
 
@@ -64,7 +67,7 @@ def get_logger(logger_name):
     logger.setLevel(_get_log_level())  # better to have too much log than not enough
     logger.addHandler(get_console_handler())
 
-    if config.ROLLBAR_ACCESS_TOKEN:
+    if ROLLBAR_ACCESS_TOKEN:
         logger.addHandler(get_rollbar_handler())
 
     logger.propagate = False
@@ -72,6 +75,12 @@ def get_logger(logger_name):
 
 
 def set_request_exception_signal(app):
+    # Without an access token rollbar is never initialized and there is nothing to report to.
+    if not config.ROLLBAR_ACCESS_TOKEN:
+        return
+
+    import rollbar.contrib.flask
+
     got_request_exception.connect(rollbar.contrib.flask.report_exception, app)
 
 
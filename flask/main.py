@@ -1,5 +1,53 @@
+import argparse
+import subprocess
+import sys
+
+from app import create_app
+
+# Run in a fresh interpreter so nothing the profile measures is already in sys.modules.
+STARTUP_TIMER = """
+import time
+started_at = time.perf_counter()
 from app import create_app
+imported_at = time.perf_counter()
+create_app()
+created_at = time.perf_counter()
+print(f"import app:   {(imported_at - started_at) * 1000:.1f} ms")
+print(f"create_app(): {(created_at - imported_at) * 1000:.1f} ms")
+"""
+
+
+def profile_startup(limit=20):
+    """Print where cold start time goes: the slowest imports of `app`, then the app factory."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        capture_output=True, text=True, check=True
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # import time:   self [us] | cumulative | imported package
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        imports.append((int(cumulative_us), int(self_us), module.strip()))
+    imports.sort(reverse=True)
+
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for cumulative_us, self_us, module in imports[:limit]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {module}")
+    print()
+
+    result = subprocess.run([sys.executable, '-c', STARTUP_TIMER], capture_output=True, text=True, check=True)
+    print(result.stdout, end='')
+
 
 if __name__ == '__main__':
-    app = create_app()
-    app.run(host='0.0.0.0')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--profile-startup', action='store_true', help='report import and app factory timings, then exit')
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        profile_startup()
+    else:
+        app = create_app()
+        app.run(host='0.0.0.0')
@@ -0,0 +1,90 @@
+"""
+Run forward migrations on container start, skipping all the work when the schema is current.
+
+The pre-check only lists the migrations directory and reads `db_version` over a single
+connection, so a replica that has nothing to migrate exits in milliseconds. Otherwise the
+migrations run under a Postgres advisory lock, so replicas starting together migrate one at
+a time and the ones that wait find the schema already current.
+"""
+import os
+import sys
+
+import psycopg2
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'app', 'migrations')
+# Arbitrary, but fixed: every replica has to ask for the same lock.
+MIGRATION_LOCK_ID = 727172001
+REQUIRED_ENV_VARS = ['POSTGRES_HOST', 'POSTGRES_PORT', 'POSTGRES_USER', 'POSTGRES_PASSWORD', 'POSTGRES_DB']
+
+
+def get_latest_revision(migrations_dir=MIGRATIONS_DIR):
+    # Migration files are named <revision>_<down_revision>_migration.py.
+    revisions = [file.split('_')[0] for file in os.listdir(migrations_dir) if file.endswith('_migration.py')]
+    return max(revisions, default='0000000000')
+
+
+def get_db_version(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT version FROM db_version;")
+            row = cursor.fetchone()
+    except psycopg2.errors.UndefinedTable:
+        connection.rollback()
+        return None
+    connection.rollback()
+    return f'{int(row[0] or 0):010d}' if row else None
+
+
+def run_forward_migrations():
+    from rococo.migrations.common.migration_runner import MigrationRunner
+    from rococo.migrations.postgres.cli import PostgresCli
+
+    cli = PostgresCli()
+    sys.path.append(MIGRATIONS_DIR)
+    migration = cli.MIGRATION_CLASS(cli.get_db_adapter(os.environ))
+    runner = MigrationRunner(MIGRATIONS_DIR, migration)
+    db_version = runner.get_db_version()
+    print(f"Current DB version: {db_version}")
+    runner.run_forward_migration_script(db_version)
+
+
+def main():
+    if any(not os.getenv(var) for var in REQUIRED_ENV_VARS):
+        # Leave .env file discovery to the rococo CLI.
+        from rococo.migrations.postgres.cli import main as rococo_main
+        sys.argv = [sys.argv[0], '--migrations-dir', MIGRATIONS_DIR, 'rf']
+        return rococo_main()
+
+    latest_revision = get_latest_revision()
+    connection = psycopg2.connect(
+        host=os.environ['POSTGRES_HOST'],
+        port=int(os.environ['POSTGRES_PORT']),
+        user=os.environ['POSTGRES_USER'],
+        password=os.environ['POSTGRES_PASSWORD'],
+        dbname=os.environ['POSTGRES_DB'],
+    )
+    try:
+        if get_db_version(connection) == latest_revision:
+            print(f"DB version {latest_revision} is current, no migrations to run.")
+            return
+
+        # Session level: held across the migrations' own connections and released if this process dies.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_ID,))
+        connection.commit()
+        try:
+            # Another replica may have migrated while this one waited for the lock.
+            if get_db_version(connection) == latest_revision:
+                print(f"DB version {latest_revision} is current, no migrations to run.")
+                return
+            run_forward_migrations()
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_ID,))
+            connection.commit()
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
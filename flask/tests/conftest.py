@@ -0,0 +1,55 @@
+import os
+import sys
+
+FLASK_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# The app runs from the flask directory with the repository root (for `common`) on the path.
+sys.path[:0] = [FLASK_DIR, os.path.dirname(FLASK_DIR)]
+
+# Read once when the config is first built; no database or broker is contacted at import.
+for name, value in {
+    'APP_ENV': 'test',
+    'POSTGRES_HOST': 'localhost',
+    'POSTGRES_PORT': '5432',
+    'POSTGRES_USER': 'test',
+    'POSTGRES_PASSWORD': 'test',
+    'POSTGRES_DB': 'test',
+    'RABBITMQ_HOST': 'localhost',
+    'RABBITMQ_PORT': '5672',
+    'RABBITMQ_USER': 'test',
+    'RABBITMQ_PASSWORD': 'test',
+    'AUTH_JWT_SECRET': 'test',
+    'SECRET_KEY': 'test',
+    'SECURITY_PASSWORD_SALT': 'test',
+    'VUE_APP_URI': 'http://localhost',
+    'ROLLBAR_ACCESS_TOKEN': '',
+}.items():
+    os.environ.setdefault(name, value)
+os.environ['QUERY_BUDGETS_ENFORCED'] = 'true'
+
+# The app reads the environment above when it is imported.
+import pytest
+
+from app import create_app
+from app.helpers.revocation_list import revocation_list
+from common.repositories import factory
+from in_memory_db import InMemoryDatabase
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """An in-memory database behind every repository, in place of the request pool."""
+    database = InMemoryDatabase()
+    monkeypatch.setattr(factory, "get_connection_resolver", lambda: database.connect)
+    monkeypatch.setattr(factory, "get_connection_closer", lambda: None)
+    # Loaded from this test's database on the first check.
+    monkeypatch.setattr(revocation_list, "_revoked_before", {})
+    monkeypatch.setattr(revocation_list, "_loaded_at", None)
+    return database
@@ -0,0 +1,239 @@
+"""
+An in-memory stand-in for the Postgres connections the repositories use.
+
+It understands the statement shapes rococo's adapter and our repositories write: selects with
+`AND`ed conditions, `GROUP BY` with `MAX`, `ORDER BY` and `LIMIT`, `UPDATE ... SET ... WHERE`,
+single and multi-row upserts, and the audit-table copies (which it skips). Anything else raises
+`NotImplementedError` naming the statement, so a test fails loudly rather than passing on a
+statement that was silently ignored.
+
+Every statement, commit and rollback is reported through `notify_query_listeners`, as an
+`InstrumentedConnection` would, so query budgets are enforced against it.
+"""
+import re
+import time
+from datetime import datetime
+
+from common.utils.instrumented_db import COMMIT, ROLLBACK, notify_query_listeners
+
+_SELECT = re.compile(
+    r"^SELECT (?P<columns>.+?) FROM (?P<table>\w+)(?: AS \w+)?(?: WHERE (?P<where>.+?))?"
+    r"(?: GROUP BY (?P<group_by>[\w.]+))?(?: ORDER BY (?P<order_by>.+?))?(?: LIMIT (?P<limit>\d+|%s))?"
+    r"(?: OFFSET (?P<offset>\d+))?(?: FOR UPDATE SKIP LOCKED)?$",
+    re.IGNORECASE,
+)
+_UPDATE = re.compile(r"^UPDATE (?P<table>\w+) SET (?P<assignments>.+?) WHERE (?P<where>.+)$", re.IGNORECASE)
+_UPSERT = re.compile(r"^WITH updated AS \( UPDATE \w+ SET .+ INSERT INTO (?P<table>\w+) \((?P<columns>[^)]+)\) SELECT ", re.IGNORECASE)
+_INSERT_VALUES = re.compile(r"^INSERT INTO (?P<table>\w+) \((?P<columns>[^)]+)\) VALUES ", re.IGNORECASE)
+_AUDIT_COPY = re.compile(r"^INSERT INTO \w+_audit \(SELECT \* FROM \w+ WHERE ", re.IGNORECASE)
+_NOTIFY = re.compile(r"^SELECT pg_notify\(", re.IGNORECASE)
+_CONDITION = re.compile(
+    r"^(?:\w+\.)?(?P<column>\w+) (?:(?P<operator>=|<>|>=|<=|>|<) ?(?P<value>%s|true|false|'[^']*'|\d+)"
+    r"|IN \((?P<in>[%s, ]+)\)|IS (?P<is_not>NOT )?NULL)$",
+    re.IGNORECASE,
+)
+_MAX = re.compile(r"^MAX\((?:\w+\.)?(?P<column>\w+)\)(?: AS (?P<alias>\w+))?$", re.IGNORECASE)
+_DATETIME = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+
+_OPERATORS = {
+    "=": lambda a, b: a == b,
+    "<>": lambda a, b: a != b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+}
+
+
+def _normalize(query) -> str:
+    if isinstance(query, bytes):
+        query = query.decode()
+    return re.sub(r"\s+", " ", query).strip().rstrip(";").strip()
+
+
+def _to_stored(value):
+    # rococo writes datetimes as '%Y-%m-%d %H:%M:%S' strings; Postgres hands them back as datetimes.
+    if isinstance(value, str) and _DATETIME.match(value):
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def _to_compared(stored, value):
+    # rococo's adapter compares `active` with the string 'true'.
+    if isinstance(stored, bool) and isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return _to_stored(value)
+
+
+class InMemoryDatabase:
+    """Tables of rows, keyed by table name and then by `entity_id`."""
+
+    def __init__(self):
+        self.tables = {}
+
+    def insert(self, table: str, row: dict) -> None:
+        self.tables.setdefault(table, {})[row["entity_id"]] = {key: _to_stored(value) for key, value in row.items()}
+
+    def connect(self, *args, **kwargs) -> "InMemoryConnection":
+        """A connection resolver for `PostgreSQLAdapter`."""
+        return InMemoryConnection(self)
+
+
+class InMemoryConnection:
+
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+
+    def cursor(self, name=None):
+        return InMemoryCursor(self.database)
+
+    def commit(self):
+        notify_query_listeners(COMMIT, None, 0.0)
+
+    def rollback(self):
+        notify_query_listeners(ROLLBACK, None, 0.0)
+
+    def close(self):
+        pass
+
+
+class InMemoryCursor:
+
+    def __init__(self, database: InMemoryDatabase):
+        self.database = database
+        self.description = None
+        self.rowcount = -1
+        self._rows = []
+
+    def execute(self, query, vars=None):
+        started_at = time.perf_counter()
+        try:
+            self._execute(_normalize(query), list(vars or ()))
+        finally:
+            notify_query_listeners(query, vars, time.perf_counter() - started_at)
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+    def _execute(self, query: str, values: list) -> None:
+        self.description = None
+        self._rows = []
+        if _NOTIFY.match(query):
+            self.description = []
+        elif _AUDIT_COPY.match(query):
+            pass
+        elif match := _UPSERT.match(query):
+            columns = [column.strip() for column in match["columns"].split(",")]
+            self._upsert(match["table"], columns, [values[-len(columns):]])
+        elif match := _INSERT_VALUES.match(query):
+            columns = [column.strip() for column in match["columns"].split(",")]
+            self._upsert(match["table"], columns, [values[i:i + len(columns)] for i in range(0, len(values), len(columns))])
+        elif match := _UPDATE.match(query):
+            self._update(query, match, values)
+        elif match := _SELECT.match(query):
+            self._select(query, match, values)
+        else:
+            raise NotImplementedError(f"The in-memory database does not understand: {query}")
+
+    def _upsert(self, table: str, columns: list, rows: list) -> None:
+        for row in rows:
+            self.database.insert(table, dict(zip(columns, row)))
+        self.rowcount = len(rows)
+
+    def _update(self, query: str, match, values: list) -> None:
+        assignments = [assignment.split("=")[0].strip() for assignment in match["assignments"].split(",")]
+        new_values, values = values[:len(assignments)], values[len(assignments):]
+        rows = self._filter(query, match["table"], match["where"], values)
+        for row in rows:
+            row.update({column: _to_stored(value) for column, value in zip(assignments, new_values)})
+        self.rowcount = len(rows)
+
+    def _select(self, query: str, match, values: list) -> None:
+        limit = match["limit"]
+        if limit == "%s":
+            limit = values.pop()
+        rows = self._filter(query, match["table"], match["where"], values)
+
+        for order in reversed((match["order_by"] or "").split(",") if match["order_by"] else []):
+            column, _, direction = order.strip().partition(" ")
+            rows.sort(key=lambda row: row[column.split(".")[-1]], reverse=direction.lower() == "desc")
+        if match["offset"]:
+            rows = rows[int(match["offset"]):]
+        if limit is not None:
+            rows = rows[:int(limit)]
+
+        columns = [column.strip() for column in match["columns"].split(",")]
+        if match["group_by"]:
+            rows = self._group(query, match["group_by"].split(".")[-1], columns, rows)
+            columns = [self._get_column_name(column) for column in columns]
+        elif columns in (["*"], [f"{match['table']}.*"]):
+            columns = list(rows[0]) if rows else []
+        elif unknown := [column for column in columns if not re.match(r"^\w+$", column)]:
+            raise NotImplementedError(f"The in-memory database does not understand the columns {unknown} of: {query}")
+
+        self.description = [(column,) for column in columns]
+        self._rows = [tuple(row.get(column) for column in columns) for row in rows]
+        self.rowcount = len(self._rows)
+
+    @staticmethod
+    def _get_column_name(column: str) -> str:
+        aggregate = _MAX.match(column)
+        return aggregate["alias"] or column if aggregate else column
+
+    def _group(self, query: str, group_by: str, columns: list, rows: list) -> list:
+        groups = {}
+        for row in rows:
+            groups.setdefault(row[group_by], []).append(row)
+
+        grouped = []
+        for key, group in groups.items():
+            result = {}
+            for column in columns:
+                if column == group_by:
+                    result[column] = key
+                elif aggregate := _MAX.match(column):
+                    result[aggregate["alias"] or column] = max(row[aggregate["column"]] for row in group)
+                else:
+                    raise NotImplementedError(f"The in-memory database cannot group {column} in: {query}")
+            grouped.append(result)
+        return grouped
+
+    def _filter(self, query: str, table: str, where: str, values: list) -> list:
+        rows = list(self.database.tables.get(table, {}).values())
+        if not where:
+            return rows
+
+        for condition in re.split(r" AND ", where, flags=re.IGNORECASE):
+            match = _CONDITION.match(condition.strip())
+            if not match:
+                raise NotImplementedError(f"The in-memory database does not understand {condition!r} in: {query}")
+            column = match["column"]
+            if match["in"] is not None:
+                count = match["in"].count("%s")
+                allowed, values = values[:count], values[count:]
+                rows = [row for row in rows if row.get(column) in allowed]
+            elif match["operator"]:
+                literal = match["value"]
+                if literal == "%s":
+                    value, values = values[0], values[1:]
+                elif literal.lower() in ("true", "false"):
+                    value = literal.lower() == "true"
+                elif literal.startswith("'"):
+                    value = literal[1:-1]
+                else:
+                    value = int(literal)
+                compare = _OPERATORS[match["operator"]]
+                rows = [row for row in rows if compare(row.get(column), _to_compared(row.get(column), value))]
+            elif match["is_not"]:
+                rows = [row for row in rows if row.get(column) is not None]
+            else:
+                rows = [row for row in rows if row.get(column) is None]
+        return rows
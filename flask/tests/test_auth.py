@@ -0,0 +1,49 @@
+import pytest
+
+from app.helpers.revocation_list import revocation_list
+from common.app_config import config
+from common.models import Email, LoginMethod, Person
+from common.models.login_method import LoginMethodType
+from common.services.auth import AuthService
+
+NEW_PASSWORD = "N3w-password"
+
+
+@pytest.fixture
+def login_method(db):
+    person = Person(first_name="Ada", last_name="Lovelace")
+    email = Email(person_id=person.entity_id, email="ada@example.com")
+    login_method = LoginMethod(method_type=LoginMethodType.EMAIL_PASSWORD, password="old password hash")
+    login_method.person_id = person.entity_id
+    login_method.email_id = email.entity_id
+    for table, instance in (("person", person), ("email", email), ("login_method", login_method)):
+        instance.prepare_for_save(changed_by_id=person.entity_id)
+        db.insert(table, instance.as_dict())
+    return login_method
+
+
+def reset_password(client, login_method) -> str:
+    token, uid = AuthService(config).generate_email_token(login_method, "ada@example.com", "reset_password")
+    response = client.post(f'/auth/reset_password/{token}/{uid}', json={"password": NEW_PASSWORD})
+    assert response.status_code == 200
+    # As once the revocation list reloads on its interval.
+    revocation_list._loaded_at = None
+    return response.json["access_token"]
+
+
+def test_token_from_password_reset_is_not_revoked(app, login_method):
+    client = app.test_client()
+    access_token = reset_password(client, login_method)
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+    assert client.get('/todo', headers=headers).status_code == 200
+    assert client.get('/person/me', headers=headers).status_code == 200
+
+
+@pytest.mark.parametrize("path", ['/todo', '/person/me'])
+def test_token_from_before_password_reset_is_revoked(app, login_method, path):
+    client = app.test_client()
+    old_access_token, _ = AuthService(config).generate_access_token(login_method)
+    reset_password(client, login_method)
+
+    assert client.get(path, headers={"Authorization": f"Bearer {old_access_token}"}).status_code == 401
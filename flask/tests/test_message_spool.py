@@ -0,0 +1,33 @@
+import os
+import time
+
+from common.tasks.send_message import MessageSpool
+
+
+def claim_all(spool, age: float) -> None:
+    # What a drain that died before sending leaves behind.
+    for file_name in os.listdir(spool.spool_dir):
+        claimed_path = os.path.join(spool.spool_dir, file_name + ".sending")
+        os.rename(os.path.join(spool.spool_dir, file_name), claimed_path)
+        os.utime(claimed_path, (time.time() - age, time.time() - age))
+
+
+def test_stale_claim_is_replayed(tmp_path):
+    spool = MessageSpool(str(tmp_path), claim_timeout=60)
+    spool.write("queue", {"n": 1})
+    claim_all(spool, age=120)
+
+    sent = []
+    assert spool.has_messages()
+    assert spool.drain(lambda *message: sent.append(message)) == 1
+    assert sent == [("queue", {"n": 1}, None, None)]
+    assert os.listdir(tmp_path) == []
+
+
+def test_recent_claim_is_left_to_its_drain(tmp_path):
+    spool = MessageSpool(str(tmp_path), claim_timeout=60)
+    spool.write("queue", {"n": 1})
+    claim_all(spool, age=1)
+
+    assert not spool.has_messages()
+    assert spool.drain(lambda *message: None) == 0
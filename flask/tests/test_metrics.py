@@ -0,0 +1,19 @@
+from urllib.request import urlopen
+
+from app.helpers.metrics import start_metrics_server
+
+
+def test_metrics_are_not_served_on_the_api_port(app):
+    assert app.test_client().get('/metrics').status_code == 404
+
+
+def test_metrics_server_serves_metrics(app):
+    server = start_metrics_server(app, 0)
+    try:
+        with urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert "db_pool_max_connections" in body
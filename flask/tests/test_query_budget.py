@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.helpers import revocation_list as revocation_list_module
+from app.helpers.query_budget import QueryBudgetExceededError, query_budget
+from app.helpers.revocation_list import RevocationList
+from common.app_config import config
+from common.models.todo import Todo
+from common.services.auth import AuthService
+from common.utils.instrumented_db import notify_query_listeners
+
+TODO_BY_ID_QUERY = "SELECT * FROM todo WHERE entity_id = %s"
+
+
+def run_query(query, vars=None):
+    # Stands in for a statement run on a pooled connection.
+    notify_query_listeners(query, vars, 0.001)
+
+
+PERSON_ID = "a" * 32
+
+
+@pytest.fixture
+def app(app):
+    @app.route('/test/n-plus-one')
+    @query_budget(2)
+    def n_plus_one():
+        run_query("SELECT * FROM todo WHERE person_id = %s", ("person",))
+        for todo_id in ("a", "b", "c"):
+            run_query(TODO_BY_ID_QUERY, (todo_id,))
+        return "ok"
+
+    @app.route('/test/within-budget')
+    @query_budget(1)
+    def within_budget():
+        run_query(TODO_BY_ID_QUERY, ("a",))
+        run_query("COMMIT")
+        return "ok"
+
+    return app
+
+
+def test_request_over_budget_raises_with_repeated_shapes(app):
+    with pytest.raises(QueryBudgetExceededError) as exc_info:
+        app.test_client().get('/test/n-plus-one')
+
+    report = str(exc_info.value)
+    assert "exceeded its budget of 2 statements" in report
+    assert "4 statements" in report
+    assert "3x (repeated) SELECT * FROM todo WHERE entity_id = ?" in report
+
+
+def test_commits_do_not_count(app):
+    assert app.test_client().get('/test/within-budget').status_code == 200
+
+
+def test_revocation_list_reload_does_not_count(app, monkeypatch):
+    class RevocationServiceStub:
+        def __init__(self, config):
+            pass
+
+        def get_active_revocations(self):
+            run_query("SELECT * FROM access_token_revocation WHERE revoked_before > %s", ("2024-01-01",))
+            return {}
+
+    monkeypatch.setattr(revocation_list_module, "AccessTokenRevocationService", RevocationServiceStub)
+    revocation_list = RevocationList(config, refresh_interval=30)
+
+    @app.route('/test/stateless-auth')
+    @query_budget(1)
+    def stateless_auth():
+        # The first check in a process loads the list, as stateless auth does.
+        revocation_list.is_revoked("person", 0)
+        run_query(TODO_BY_ID_QUERY, ("a",))
+        return "ok"
+
+    assert app.test_client().get('/test/stateless-auth').status_code == 200
+
+
+@pytest.fixture
+def headers():
+    access_token, _ = AuthService(config).generate_access_token(SimpleNamespace(person_id=PERSON_ID, email_id="b" * 32))
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+@pytest.fixture
+def todos(db):
+    todos = [Todo(person_id=PERSON_ID, title=f"Todo {number}") for number in range(3)]
+    for todo in todos:
+        todo.prepare_for_save(changed_by_id=PERSON_ID)
+        db.insert("todo", todo.as_dict())
+    return todos
+
+
+def test_todo_list_within_budget(app, headers, todos):
+    response = app.test_client().get('/todo', headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json["todos"]) == 3
+
+
+def test_todo_patch_within_budget(app, headers, todos, db):
+    response = app.test_client().patch(
+        f'/todo/{todos[0].entity_id}', headers=headers, json={"title": "Renamed", "is_completed": True}
+    )
+
+    assert response.status_code == 200
+    assert db.tables["todo"][todos[0].entity_id]["title"] == "Renamed"
+
+
+def test_complete_all_todos_within_budget(app, headers, todos, db):
+    response = app.test_client().post('/todo/complete', headers=headers)
+
+    assert response.status_code == 200
+    assert all(row["is_completed"] for row in db.tables["todo"].values())
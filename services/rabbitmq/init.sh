@@ -1,12 +1,23 @@
 #!/bin/sh
 
+# Email lanes: transactional mail (password resets) and bulk mail (welcome emails) are
+# consumed from separate queues; messages rejected by the email transmitter are
+# dead-lettered to a third queue for inspection.
+EMAIL_QUEUE_NAME="${EmailServiceProcessor_QUEUE_NAME:-email-transmitter}"
+EMAIL_PRIORITY_QUEUE_NAME="${EmailServiceProcessor_PRIORITY_QUEUE_NAME:-email-transmitter-priority}"
+EMAIL_DEAD_LETTER_QUEUE_NAME="${EmailServiceProcessor_DEAD_LETTER_QUEUE_NAME:-email-transmitter-dead-letter}"
+
 # Create Rabbitmq user
 ( rabbitmqctl wait --timeout 60 "$RABBITMQ_PID_FILE" ; \
 rabbitmqctl add_user "$RABBITMQ_USER" "$RABBITMQ_PASSWORD" 2>/dev/null ; \
 rabbitmqctl set_user_tags "$RABBITMQ_USER" administrator ; \
 rabbitmqctl add_vhost "$RABBITMQ_VIRTUAL_HOST" ; \
 rabbitmqctl set_permissions -p "$RABBITMQ_VIRTUAL_HOST" "$RABBITMQ_USER"  ".*" ".*" ".*" ; \
-echo "*** User '$RABBITMQ_USER' with password '$RABBITMQ_PASSWORD' completed. ***") &
+echo "*** User '$RABBITMQ_USER' with password '$RABBITMQ_PASSWORD' completed. ***" ; \
+rabbitmqctl set_policy -p "$RABBITMQ_VIRTUAL_HOST" --apply-to queues email-dead-letter \
+    "^${QUEUE_NAME_PREFIX}(${EMAIL_QUEUE_NAME}|${EMAIL_PRIORITY_QUEUE_NAME})\$" \
+    "{\"dead-letter-exchange\":\"\",\"dead-letter-routing-key\":\"${QUEUE_NAME_PREFIX}${EMAIL_DEAD_LETTER_QUEUE_NAME}\"}" ; \
+echo "*** Dead-letter policy for email lanes completed. ***") &
 
 # Set the RabbitMQ configuration file
 RABBITMQ_CONFIG_FILE="/etc/rabbitmq/rabbitmq.conf"